@@ -0,0 +1,66 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for parsing inischema files with many attributed options.
+
+Run with: python benchmarks/bench_attributed.py [number of options]
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+from io import StringIO
+
+from configglue.inischema.attributed import AttributedConfigParser
+
+
+class PerOptionConfigParser(AttributedConfigParser):
+    """AttributedConfigParser.parse_all as implemented before grouping."""
+
+    def parse_all(self):
+        for section in self.sections():
+            for option in self.normalized_options(section):
+                self.parse(section, option)
+
+
+def make_config(size):
+    lines = ['[options]']
+    for i in range(size):
+        lines.append('option%d = %d' % (i, i))
+        lines.append('option%d.parser = int' % i)
+        lines.append('option%d.default = 0' % i)
+        lines.append('option%d.help = help for option %d' % (i, i))
+    return '\n'.join(lines)
+
+
+def time_parse_all(parser_class, config, number=3):
+    def run():
+        parser = parser_class()
+        parser.readfp(StringIO(config))
+        parser.parse_all()
+    return min(timeit.repeat(run, number=1, repeat=number))
+
+
+def main(size=1000):
+    config = make_config(size)
+    print('%d options with 3 attributes each' % size)
+    for parser_class in (PerOptionConfigParser, AttributedConfigParser):
+        elapsed = time_parse_all(parser_class, config)
+        print('%-25s %9.2fms' % (parser_class.__name__, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
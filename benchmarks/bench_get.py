@@ -0,0 +1,86 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for SchemaConfigParser.get on mostly defaulted configs.
+
+Times looking up every option of a schema whose config files only set a
+few of them, so most values come from the schema defaults.
+
+Run with: python benchmarks/bench_get.py [sections] [options] [percent set]
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+from io import StringIO
+
+from configglue.parser import SchemaConfigParser
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+class BenchSchema(Schema):
+    pass
+
+
+def make_schema(sections, options):
+    for i in range(sections):
+        attrs = {}
+        for j in range(options):
+            if j % 2:
+                attrs['option%d' % j] = IntOption(default=j)
+            else:
+                attrs['option%d' % j] = StringOption(default='value%d' % j)
+        section = type(str('section%d' % i), (Section,), attrs)
+        setattr(BenchSchema, 'section%d' % i, section)
+
+
+def make_config(sections, options, percent):
+    lines = []
+    for i in range(sections):
+        lines.append('[section%d]' % i)
+        lines.extend('option%d = %d' % (j, j)
+                     for j in range(options) if j * 100 < options * percent)
+    return '\n'.join(lines)
+
+
+def main(sections=20, options=50, percent=10):
+    make_schema(sections, options)
+    parser = SchemaConfigParser(BenchSchema())
+    parser.readfp(StringIO(make_config(sections, options, percent)))
+    names = [(section.name, option.name)
+             for section in parser.schema.sections()
+             for option in section.options()]
+    config = [(section, option) for section, option in names
+              if parser.has_option(section, option)]
+    defaulted = [(section, option) for section, option in names
+                 if not parser.has_option(section, option)]
+
+    def get_all(options):
+        get = parser.get
+        for section, option in options:
+            get(section, option)
+
+    print('%d options, %d set in the config' % (len(names), len(config)))
+    for name, options in (('set', config), ('defaulted', defaulted),
+                          ('all', names)):
+        elapsed = min(timeit.repeat(lambda: get_all(options), number=10,
+                                    repeat=5)) / 10
+        print('%-10s %9.2fms %7.2fus/get' % (
+            name, elapsed * 1000, elapsed * 1e6 / max(len(options), 1)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,60 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for the time it takes to import configglue.
+
+Each import is timed in a fresh interpreter, and compared against the
+startup time of an interpreter which imports nothing.
+
+Run with: python benchmarks/bench_import.py [number of runs]
+"""
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+import timeit
+
+
+STATEMENTS = [
+    'pass',
+    'import configglue',
+    'import configglue.contrib.schema',
+    'from configglue.contrib.schema import RavenSchema',
+    'import configglue.app',
+]
+
+
+def time_import(statement, runs):
+    """Return the best wall time of running statement in a new interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, '-c', statement]
+
+    def run():
+        subprocess.check_call(command, cwd=root)
+    return min(timeit.repeat(run, number=1, repeat=runs))
+
+
+def main(runs=20):
+    baseline = time_import('pass', runs)
+    for statement in STATEMENTS:
+        elapsed = time_import(statement, runs)
+        print('%-50s %7.2fms (+%.2fms)' % (
+            statement, elapsed * 1000, (elapsed - baseline) * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,90 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for reading config files from disk.
+
+Run with: python benchmarks/bench_io.py [large file options] [small files]
+"""
+from __future__ import print_function, unicode_literals
+
+import codecs
+import io
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from configglue.parser import CONFIG_FILE_ENCODING, _read_file, read_source
+
+
+def codecs_read_file(path):
+    """_read_file as implemented with codecs.open."""
+    fp = codecs.open(path, 'r', encoding=CONFIG_FILE_ENCODING)
+    try:
+        return fp.read()
+    finally:
+        fp.close()
+
+
+def codecs_read_source(data):
+    """readfp as implemented with codecs.getreader."""
+    return codecs.getreader(CONFIG_FILE_ENCODING)(io.BytesIO(data)).read()
+
+
+def bytes_read_source(data):
+    return read_source(io.BytesIO(data))
+
+
+def write_config(path, options):
+    lines = ['[__main__]']
+    lines.extend('option%d = caf\xe9 %d' % (i, i) for i in range(options))
+    with io.open(path, 'w', encoding=CONFIG_FILE_ENCODING) as fp:
+        fp.write('\n'.join(lines))
+
+
+def report(name, run):
+    elapsed = min(timeit.repeat(run, number=1, repeat=5))
+    print('  %-20s %9.2fms' % (name, elapsed * 1000))
+
+
+def main(large=200000, small=500):
+    folder = tempfile.mkdtemp()
+    try:
+        large_path = os.path.join(folder, 'large.cfg')
+        write_config(large_path, large)
+        small_paths = [os.path.join(folder, '%d.cfg' % i)
+                       for i in range(small)]
+        for path in small_paths:
+            write_config(path, 10)
+        with io.open(large_path, 'rb') as fp:
+            data = fp.read()
+
+        print('1 file with %d options' % large)
+        for read in (codecs_read_file, _read_file):
+            report(read.__name__, lambda: read(large_path))
+        print('%d files with 10 options' % small)
+        for read in (codecs_read_file, _read_file):
+            report(read.__name__, lambda: [read(p) for p in small_paths])
+        print('readfp of %d bytes' % len(data))
+        for read in (codecs_read_source, bytes_read_source):
+            report(read.__name__, lambda: read(data))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,85 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for passing a loaded config to worker processes.
+
+Compares reading the config files again in each worker with restoring a
+parser serialized by configglue.parser.dumps.
+
+Run with: python benchmarks/bench_pickle.py [files] [options per file]
+"""
+from __future__ import print_function, unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from configglue.parser import SchemaConfigParser, dumps, loads
+from configglue.schema import IntOption, Schema, Section
+
+
+class BenchSchema(Schema):
+    pass
+
+
+def make_schema(sections, options):
+    for i in range(sections):
+        section = type(str('section%d' % i), (Section,), dict(
+            ('option%d' % j, IntOption()) for j in range(options)))
+        setattr(BenchSchema, 'section%d' % i, section)
+
+
+def write_configs(folder, files, options):
+    paths = []
+    for i in range(files):
+        path = os.path.join(folder, '%d.cfg' % i)
+        lines = ['[section%d]' % i]
+        lines.extend('option%d = %d' % (j, j) for j in range(options))
+        with io.open(path, 'w') as fp:
+            fp.write('\n'.join(lines))
+        paths.append(path)
+    return paths
+
+
+def main(files=100, options=50):
+    make_schema(files, options)
+    folder = tempfile.mkdtemp()
+    try:
+        paths = write_configs(folder, files, options)
+
+        def read():
+            parser = SchemaConfigParser(BenchSchema())
+            parser.read(paths)
+            return parser
+
+        parser = read()
+        data = dumps(parser)
+        print('%d files with %d options each, %d bytes serialized' % (
+            files, options, len(data)))
+        for name, run in (('read files', read),
+                          ('loads', lambda: loads(data)),
+                          ('dumps', lambda: dumps(parser))):
+            elapsed = min(timeit.repeat(run, number=1, repeat=5))
+            print('%-15s %9.2fms' % (name, elapsed * 1000))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,62 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for reading large config files.
+
+Run with: python benchmarks/bench_read.py [number of sections] [options]
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+from io import StringIO
+
+from configglue._compat import BaseConfigParser
+from configglue._lexer import apply_tokens, tokenize
+
+
+def make_config(sections, options):
+    lines = ['# generated config']
+    for i in range(sections):
+        lines.append('[section%d]' % i)
+        for j in range(options):
+            lines.append('option%d = value %d' % (j, j))
+            if j % 10 == 0:
+                lines.append('    continued %d' % j)
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def stdlib_read(text):
+    parser = BaseConfigParser()
+    parser._read(StringIO(text), '<bench>')
+
+
+def lexer_read(text):
+    parser = BaseConfigParser()
+    apply_tokens(parser, tokenize(text, parser), '<bench>')
+
+
+def main(sections=200, options=50):
+    text = make_config(sections, options)
+    print('%d sections with %d options each' % (sections, options))
+    for read in (stdlib_read, lexer_read):
+        elapsed = min(timeit.repeat(lambda: read(text), number=1, repeat=5))
+        print('%-15s %9.2fms' % (read.__name__, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
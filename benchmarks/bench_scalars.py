@@ -0,0 +1,91 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Micro-benchmark for parsing schemas with thousands of flags.
+
+Run with: python benchmarks/bench_scalars.py [number of flags]
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import timeit
+from io import BytesIO
+
+from configglue.parser import SchemaConfigParser
+from configglue.schema import BoolOption, IntOption, Schema, Section
+
+
+class ListBoolOption(BoolOption):
+    """BoolOption as implemented before the lookup tables."""
+
+    def parse(self, value, raw=False):
+        if raw:
+            return value
+
+        if value.lower() in ['y', '1', 'yes', 'on', 'true']:
+            return True
+        elif value.lower() in ['n', '0', 'no', 'off', 'false']:
+            return False
+        else:
+            raise ValueError("Unable to determine boolosity of %r" % value)
+
+
+def make_parser(size):
+    attrs = {}
+    lines = ['[flags]']
+    words = ['yes', 'Off', 'TRUE', 'n', '1']
+    for i in range(size):
+        attrs['flag%d' % i] = BoolOption()
+        attrs['count%d' % i] = IntOption()
+        lines.append('flag%d = %s' % (i, words[i % len(words)]))
+        lines.append('count%d = %d' % (i, i))
+    flags = type(str('flags'), (Section,), attrs)
+    schema = type(str('BenchSchema'), (Schema,), {'flags': flags})
+    parser = SchemaConfigParser(schema())
+    parser.readfp(BytesIO('\n'.join(lines).encode('utf-8')))
+    return parser
+
+
+def get_all(parser):
+    """parse_all as implemented before batch parsing."""
+    for section in parser.schema.sections():
+        for option in section.options():
+            parser.get(section.name, option.name, raw=option.raw)
+
+
+def main(size=2000, repeat=5):
+    values = ['yes', 'Off', 'TRUE', 'n', '1', 'false'] * (size // 6 + 1)
+    old_option = ListBoolOption()
+    option = BoolOption()
+    timings = [
+        ('BoolOption.parse (list)',
+         lambda: [old_option.parse(v) for v in values]),
+        ('BoolOption.parse (table)',
+         lambda: [option.parse(v) for v in values]),
+    ]
+    parser = make_parser(size)
+    timings.extend([
+        ('parse_all (get per option)', lambda: get_all(parser)),
+        ('parse_all (batched)', parser.parse_all),
+    ])
+    print('%d flags, best of %d runs' % (size, repeat))
+    for name, func in timings:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print('%-30s %8.2f ms' % (name, best * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,97 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Benchmark for validating many host configs sharing included files.
+
+Compares validating each file with its own SchemaConfigParser, one at a
+time, with configglue.validate.validate_files.
+
+Run with: python benchmarks/bench_validate.py [hosts] [processes]
+"""
+from __future__ import print_function, unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from configglue import validate
+from configglue.parser import SchemaConfigParser
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+SCHEMA = 'bench_validate:BenchSchema'
+
+
+class BenchSchema(Schema):
+    host = StringOption()
+
+
+for i in range(20):
+    setattr(BenchSchema, 'section%d' % i, type(str('section%d' % i),
+            (Section,), dict(('option%d' % j, IntOption())
+                             for j in range(20))))
+
+
+def write(path, lines):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with io.open(path, 'w') as fp:
+        fp.write('\n'.join(lines))
+
+
+def make_fleet(folder, hosts):
+    for i in range(20):
+        lines = ['[section%d]' % i]
+        lines.extend('option%d = %d' % (j, j) for j in range(20))
+        write(os.path.join(folder, 'common', '%d.cfg' % i), lines)
+    includes = '\n    '.join('../../common/%d.cfg' % i for i in range(20))
+    for i in range(hosts):
+        write(os.path.join(folder, 'hosts', str(i), 'main.cfg'),
+              ['[__main__]', 'host = host%d' % i, 'includes =', '    ' +
+               includes])
+    return validate.find_configs([os.path.join(folder, 'hosts')])
+
+
+def serial(paths):
+    for path in paths:
+        parser = SchemaConfigParser(BenchSchema())
+        parser.read(path)
+        assert parser.is_valid()
+
+
+def main(hosts=1000, processes=None):
+    folder = tempfile.mkdtemp()
+    try:
+        paths = make_fleet(folder, hosts)
+        print('%d host configs including 20 shared files' % len(paths))
+        start = time.time()
+        serial(paths)
+        print('%-25s %9.2fms' % ('serial', (time.time() - start) * 1000))
+        for count in (1, processes):
+            start = time.time()
+            results = validate.validate_files(SCHEMA, paths, count)
+            assert all(result['valid'] for result in results)
+            print('%-25s %9.2fms' % ('validate_files(%s)' % count,
+                                      (time.time() - start) * 1000))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,46 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Command line tools of configglue.
+
+Run with: python -m configglue COMMAND [ARGS...]
+"""
+from __future__ import print_function
+
+import sys
+from importlib import import_module
+
+
+# command -> module providing its main function
+COMMANDS = {
+    'bundle': 'configglue.bundle',
+    'daemon': 'configglue.daemon',
+    'validate': 'configglue.validate',
+}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv[0] not in COMMANDS:
+        print("usage: python -m configglue {%s} ..." %
+              ','.join(sorted(COMMANDS)), file=sys.stderr)
+        return 2
+    return import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
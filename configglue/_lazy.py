@@ -0,0 +1,72 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Modules whose attributes are imported on first access."""
+from __future__ import absolute_import
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+
+__all__ = [
+    'lazy_module',
+]
+
+
+def lazy_module(name, registry):
+    """Make the attributes of module *name* listed in registry lazy.
+
+    *registry* maps attribute names to the name of the module defining
+    them, relative to module *name*. An attribute's module is only imported
+    when the attribute is first looked up.
+
+    """
+    module = sys.modules[name]
+
+    def __getattr__(attr):
+        try:
+            source = registry[attr]
+        except KeyError:
+            raise AttributeError(
+                "module {0!r} has no attribute {1!r}".format(name, attr))
+        value = getattr(import_module(source, name), attr)
+        setattr(sys.modules[name], attr, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[name])) | set(registry))
+
+    if sys.version_info >= (3, 7):
+        # modules support __getattr__ natively
+        module.__getattr__ = __getattr__
+        module.__dir__ = __dir__
+        return module
+
+    class LazyModule(ModuleType):
+        def __getattr__(self, attr):
+            return __getattr__(attr)
+
+        def __dir__(self):
+            return __dir__()
+
+    lazy = LazyModule(name)
+    lazy.__dict__.update(vars(module))
+    # keep the original module alive, as python 2 clears the globals of
+    # collected modules
+    lazy._module = module
+    sys.modules[name] = lazy
+    return lazy
@@ -0,0 +1,274 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""A single pass reader for ini-style config files.
+
+The config file is split into lines once, and each line is classified with
+plain string operations; multi-line values are collected in lists and
+joined at the end. The result is the same as reading the file with the
+stdlib RawConfigParser._read of the running Python version, which applies
+a regular expression to every line, with the line number of every option
+recorded on the way.
+
+"""
+import sys
+
+from ._compat import (
+    PY2,
+    DEFAULTSECT,
+    configparser,
+)
+
+
+__all__ = [
+    'apply_tokens',
+    'section_name',
+    'supports',
+    'tokenize',
+]
+
+SECTION, OPTION, ERROR, MISSING_HEADER = range(4)
+
+# \s in the python 2 regular expressions of RawConfigParser
+_ASCII_WHITESPACE = ' \t\n\r\f\v'
+
+MISSING = object()
+
+# section names end at the first ']' of the line in python 2 and older python
+# 3 releases, and at the last one in newer releases; tell them apart by the
+# header group of RawConfigParser.SECTCRE
+_SECTCRE = configparser.RawConfigParser.SECTCRE
+_GREEDY_HEADER = '(?P<header>.+)' in _SECTCRE.pattern
+
+
+def supports(parser):
+    """Return whether the lexer reads files the way parser does."""
+    if parser._optcre is not parser.OPTCRE:
+        # options without values, or custom delimiters
+        return False
+    if parser.SECTCRE.pattern != _SECTCRE.pattern:
+        # custom section headers
+        return False
+    if PY2:
+        return True
+    return not parser._inline_comment_prefixes
+
+
+def section_name(line):
+    """Return the name in a section header line, or None if it isn't one."""
+    if line[:1] != '[':
+        return None
+    if _GREEDY_HEADER:
+        end = line.rstrip().rfind(']')
+    else:
+        end = line.find(']', 1)
+    if end > 1:
+        return line[1:end]
+
+
+def _split_option(line):
+    """Return the position of the first option delimiter in line, or -1."""
+    equals = line.find('=')
+    colon = line.find(':')
+    if equals == -1 or (colon != -1 and colon < equals):
+        return colon
+    return equals
+
+
+def _tokenize_py2(lines):
+    tokens = []
+    append = tokens.append
+    seen_section = False
+    parts = None
+    for lineno, line in enumerate(lines, 1):
+        first = line[0]
+        stripped = line.strip()
+        # comment or blank line?
+        if not stripped or first in '#;':
+            continue
+        if first in 'rR' and stripped.split(None, 1)[0].lower() == 'rem':
+            continue
+        # continuation line?
+        if first.isspace() and parts is not None:
+            parts.append(stripped)
+            continue
+        # a section header?
+        if first == '[':
+            end = line.find(']', 1)
+            if end > 1:
+                append((SECTION, lineno, line[1:end], None))
+                seen_section = True
+                parts = None
+                continue
+        if not seen_section:
+            append((MISSING_HEADER, lineno, line, None))
+            break
+        # an option line?
+        delimiter = _split_option(line)
+        if (delimiter <= 0 or first in _ASCII_WHITESPACE):
+            append((ERROR, lineno, line, None))
+            continue
+        value = line[delimiter + 1:].lstrip(_ASCII_WHITESPACE)
+        if value[-1:] == '\n':
+            value = value[:-1]
+        pos = value.find(';')
+        if pos != -1 and value[pos - 1].isspace():
+            value = value[:pos]
+        value = value.strip()
+        if value == '""':
+            value = ''
+        parts = [value]
+        append((OPTION, lineno, line[:delimiter], parts))
+    return tokens
+
+
+def _tokenize_py3(lines, comment_prefixes, empty_lines_in_values):
+    tokens = []
+    append = tokens.append
+    seen_section = False
+    parts = None
+    indent_level = 0
+    for lineno, line in enumerate(lines, 1):
+        value = line.strip()
+        comment = bool(comment_prefixes) and value.startswith(comment_prefixes)
+        if comment or not value:
+            if empty_lines_in_values:
+                # add empty line to the value, but only if there was no
+                # comment on the line
+                if not comment and parts is not None:
+                    parts.append('')
+            else:
+                # empty line marks end of value
+                indent_level = sys.maxsize
+            continue
+        # continuation line?
+        cur_indent_level = len(line) - len(line.lstrip())
+        if parts is not None and cur_indent_level > indent_level:
+            parts.append(value)
+            continue
+        indent_level = cur_indent_level
+        # a section header?
+        if value[0] == '[':
+            if _GREEDY_HEADER:
+                end = value.rfind(']')
+            else:
+                end = value.find(']', 1)
+            if end > 1:
+                append((SECTION, lineno, value[1:end], None))
+                seen_section = True
+                parts = None
+                continue
+        if not seen_section:
+            append((MISSING_HEADER, lineno, line, None))
+            break
+        # an option line?
+        delimiter = _split_option(value)
+        if delimiter == -1:
+            append((ERROR, lineno, line, None))
+            continue
+        name = value[:delimiter].rstrip()
+        if not name:
+            append((ERROR, lineno, line, None))
+        values = [value[delimiter + 1:].strip()]
+        append((OPTION, lineno, name, values))
+        # options without a name can't have continuation lines
+        parts = values if name else None
+    return tokens
+
+
+def tokenize(text, parser):
+    """Return the list of tokens in the text of a config file.
+
+    Each token is a (kind, line number, text, values) tuple.
+
+    """
+    lines = text.splitlines(True)
+    if PY2:
+        return _tokenize_py2(lines)
+    return _tokenize_py3(lines, parser._comment_prefixes,
+                         parser._empty_lines_in_values)
+
+
+def apply_tokens(parser, tokens, fpname):
+    """Update the state of parser with the tokens read from a file.
+
+    Return a dict mapping the (section, option) pairs set by the tokens to
+    the line number of the option in the file and the value the option had
+    before, or MISSING.
+
+    """
+    if PY2:
+        default_section = DEFAULTSECT
+        strict = False
+    else:
+        default_section = parser.default_section
+        strict = parser._strict
+    elements_added = set()
+    assigned = {}
+    optionxform = parser.optionxform
+    cursect = None
+    sectname = None
+    error = None
+    for kind, lineno, text, values in tokens:
+        if kind == OPTION:
+            optname = optionxform(text.rstrip())
+            key = (sectname, optname)
+            if strict:
+                if key in elements_added:
+                    raise configparser.DuplicateOptionError(
+                        sectname, optname, fpname, lineno)
+                elements_added.add(key)
+            if key in assigned:
+                assigned[key] = (lineno, assigned[key][1])
+            else:
+                assigned[key] = (lineno, cursect.get(optname, MISSING))
+            if PY2:
+                # continuation lines are already collected
+                cursect[optname] = '\n'.join(values)
+            else:
+                cursect[optname] = list(values)
+        elif kind == SECTION:
+            sectname = text
+            if sectname in parser._sections:
+                if strict and sectname in elements_added:
+                    raise configparser.DuplicateSectionError(
+                        sectname, fpname, lineno)
+                cursect = parser._sections[sectname]
+                elements_added.add(sectname)
+            elif sectname == default_section:
+                cursect = parser._defaults
+            else:
+                cursect = parser._dict()
+                if PY2:
+                    cursect['__name__'] = sectname
+                else:
+                    parser._proxies[sectname] = configparser.SectionProxy(
+                        parser, sectname)
+                parser._sections[sectname] = cursect
+                elements_added.add(sectname)
+        elif kind == ERROR:
+            if error is None:
+                error = configparser.ParsingError(fpname)
+            error.append(lineno, repr(text))
+        else:
+            raise configparser.MissingSectionHeaderError(
+                fpname, lineno, text)
+
+    if not PY2:
+        parser._join_multiline_values()
+    if error is not None:
+        raise error
+    return assigned
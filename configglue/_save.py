@@ -0,0 +1,234 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Durable updates of config files.
+
+Saving the changes to a set of config files happens in two steps: the new
+content of every file is written to a temporary file and flushed to disk,
+and only then are the files moved in place. A failure in either step
+leaves the original files untouched.
+
+"""
+from __future__ import unicode_literals
+
+import io
+import os
+import re
+import shutil
+
+from ._lexer import section_name
+
+__all__ = [
+    'save_files',
+    'update_lines',
+]
+
+OPTION_RE = re.compile(r'(?P<option>[^:=\s][^:=]*)\s*[:=]')
+
+ENCODING = 'utf-8'
+
+
+def _is_comment(stripped):
+    return (stripped[:1] in ('#', ';') or
+            stripped.split(None, 1)[0].lower() == 'rem')
+
+
+def format_option(option, value):
+    """Return the config file line for an option."""
+    return "%s = %s\n" % (option, value.replace('\n', '\n\t'))
+
+
+def update_lines(lines, sections, optionxform=None):
+    """Return the lines of a config file with some options changed.
+
+    *sections* maps section names to dicts of option names and their new
+    values, or None for options to remove. Options already in the file are
+    replaced where they are, new options are added at the end of their
+    section and new sections at the end of the file. Every other line,
+    including comments, is kept as is.
+
+    *optionxform* normalizes option names, lowercasing them by default.
+
+    """
+    if optionxform is None:
+        optionxform = lambda option: option.lower()
+    pending = {}
+    for section, options in sections.items():
+        pending[section] = dict((optionxform(option), value)
+                                for option, value in options.items())
+
+    result = []
+    # section name -> index where new options of the section are added
+    section_end = {}
+    current = None
+    replaced = set()
+    skipping = False
+    # blank and comment lines following a replaced option, which are part
+    # of its value when more continuation lines follow them
+    held = []
+    for line in lines:
+        if not line.endswith('\n'):
+            line += '\n'
+        stripped = line.strip()
+        continuation = line[:1].isspace() and stripped
+        if skipping:
+            if continuation:
+                # continuation line of a replaced option
+                result.extend(held_line for held_line in held
+                              if held_line.strip())
+                held = []
+                continue
+            if not stripped or _is_comment(stripped):
+                held.append(line)
+                continue
+            result.extend(held)
+            held = []
+            skipping = False
+
+        if not stripped or _is_comment(stripped):
+            result.append(line)
+            continue
+        name = section_name(line)
+        if name is not None:
+            current = name
+            result.append(line)
+            section_end[current] = len(result)
+            continue
+        match = None if continuation else OPTION_RE.match(line)
+        if match and current in pending:
+            key = optionxform(match.group('option').rstrip())
+            if key in pending[current]:
+                value = pending[current][key]
+                if (current, key) not in replaced and value is not None:
+                    result.append(format_option(key, value))
+                    section_end[current] = len(result)
+                replaced.add((current, key))
+                skipping = True
+                continue
+        result.append(line)
+        if current is not None:
+            section_end[current] = len(result)
+
+    result.extend(held)
+
+    # add the options not found in the file
+    inserts = []
+    for section, options in pending.items():
+        added = [format_option(key, value)
+                 for key, value in sorted(options.items())
+                 if (section, key) not in replaced and value is not None]
+        if not added:
+            continue
+        if section in section_end:
+            inserts.append((section_end[section], added))
+        else:
+            if result and result[-1].strip():
+                result.append('\n')
+            result.append('[%s]\n' % section)
+            result.extend(added)
+    for index, added in sorted(inserts, reverse=True):
+        result[index:index] = added
+    return result
+
+
+def read_lines(filename):
+    """Return the lines of a config file, or [] if it doesn't exist."""
+    try:
+        with io.open(filename, encoding=ENCODING) as fp:
+            return fp.readlines()
+    except IOError:
+        if os.path.exists(filename):
+            raise
+        return []
+
+
+def _fsync_dir(path):
+    """Flush a directory entry changes to disk, where supported."""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        # directories can't be opened on some platforms
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _backup(filename):
+    """Keep a copy of a file as filename.old, return whether it existed."""
+    backup = '%s.old' % filename
+    if not os.path.exists(filename):
+        return False
+    if os.path.exists(backup):
+        os.remove(backup)
+    try:
+        os.link(filename, backup)
+    except (AttributeError, OSError):
+        # no hard links on this platform or file system
+        shutil.copy2(filename, backup)
+    return True
+
+
+# os.rename doesn't replace existing files on windows
+_replace = getattr(os, 'replace', os.rename)
+
+
+def save_files(contents):
+    """Replace the content of several files, all or nothing.
+
+    *contents* is a list of (filename, text) tuples. The previous content
+    of each file is kept as filename.old.
+
+    """
+    written = []
+    try:
+        for filename, text in contents:
+            tmp_path = '%s.new' % filename
+            written.append(tmp_path)
+            with io.open(tmp_path, 'w', encoding=ENCODING) as fp:
+                fp.write(text)
+                fp.flush()
+                os.fsync(fp.fileno())
+    except Exception:
+        for tmp_path in written:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    # filename -> whether it had a backup, for the files already replaced
+    committed = []
+    try:
+        for filename, text in contents:
+            had_backup = _backup(filename)
+            _replace('%s.new' % filename, filename)
+            committed.append((filename, had_backup))
+    except Exception:
+        for filename, had_backup in reversed(committed):
+            if had_backup:
+                _replace('%s.old' % filename, filename)
+            else:
+                os.remove(filename)
+        for tmp_path in written:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    finally:
+        for path in set(os.path.dirname(filename)
+                        for filename, text in contents):
+            _fsync_dir(path)
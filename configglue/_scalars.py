@@ -0,0 +1,88 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Parsers for scalar option values.
+
+Boolean words are resolved through lookup tables holding every upper/lower
+case spelling of each word, so parsing a value is a single dict lookup
+instead of lowercasing it and scanning a list.
+
+"""
+from __future__ import unicode_literals
+
+from itertools import product
+
+
+__all__ = [
+    'BOOL_VALUES',
+    'make_bool_table',
+    'parse_bool',
+    'parse_bools',
+    'parse_ints',
+]
+
+
+def _case_variants(word):
+    """Return every upper/lower case spelling of word."""
+    choices = [set((c.lower(), c.upper())) for c in word]
+    return [''.join(chars) for chars in product(*choices)]
+
+
+def make_bool_table(true_words, false_words):
+    """Return a dict mapping each spelling of the given words to a bool."""
+    table = {}
+    for words, result in ((true_words, True), (false_words, False)):
+        for word in words:
+            for variant in _case_variants(word):
+                table[variant] = result
+    return table
+
+
+BOOL_VALUES = make_bool_table(
+    ('y', '1', 'yes', 'on', 'true'),
+    ('n', '0', 'no', 'off', 'false'))
+
+
+def parse_bool(value, table=BOOL_VALUES):
+    """Return the boolosity of value according to table."""
+    try:
+        return table[value]
+    except KeyError:
+        raise ValueError("Unable to determine boolosity of %r" % value)
+
+
+def parse_bools(values, table=BOOL_VALUES):
+    """Return the boolosity of each one of values.
+
+    Raise ValueError for the first value that is not in table.
+
+    """
+    missing = object()
+    get = table.get
+    result = [get(value, missing) for value in values]
+    if missing in result:
+        # report the offending value
+        parse_bool(values[result.index(missing)], table)
+    return result
+
+
+def parse_ints(values, *args):
+    """Return each one of values parsed as an int.
+
+    Extra args, like the base, are passed on to int.
+
+    """
+    return [int(value, *args) for value in values]
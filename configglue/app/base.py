@@ -17,8 +17,6 @@ import os.path
 import sys
 from optparse import OptionParser
 
-from xdg.BaseDirectory import load_config_paths
-
 from configglue.glue import configglue
 from configglue.schema import (
     Schema,
@@ -32,24 +30,61 @@ __all__ = [
 ]
 
 
+def _list_dir(path):
+    """Return the set of entries in a directory, empty if it's unreadable."""
+    try:
+        return set(os.listdir(path))
+    except OSError:
+        return set()
+
+
 class Config(object):
+    # number of threads used to scan config directories and read files;
+    # starting threads costs more than it saves for the few local files of
+    # most apps, so raise it only for configs on slow or remote filesystems
+    workers = 1
+
     def __init__(self, app):
         schemas = [app.schema] + app.plugins.schemas
         self.schema = merge(*schemas)
 
         # initialize config
         config_files = self.get_config_files(app)
-        self.glue = configglue(self.schema, config_files, op=app.parser)
+        self.glue = configglue(self.schema, config_files, op=app.parser,
+                               workers=self.workers)
 
     def get_config_files(self, app):
+        # import here as xdg is only needed for locating config files
+        from xdg.BaseDirectory import load_config_paths
+
+        paths = list(reversed(list(load_config_paths(app.name))))
+
         config_files = []
-        for path in reversed(list(load_config_paths(app.name))):
-            self._add_config_file(config_files, path, app.name)
-            for plugin in app.plugins.enabled:
-                self._add_config_file(config_files, path, plugin.__name__)
+        if paths:
+            names = [app.name] + [plugin.__name__
+                                  for plugin in app.plugins.enabled]
+            names = ["{0}.cfg".format(name.lower()) for name in names]
+        for path, entries in zip(paths, self._scan_dirs(paths)):
+            for name in names:
+                if name in entries:
+                    config_files.append(os.path.join(path, name))
         self._add_config_file(config_files, '.', 'local')
         return config_files
 
+    def _scan_dirs(self, paths):
+        """Return the entries of each directory, scanning them concurrently."""
+        if self.workers > 1 and len(paths) > 1:
+            # import here as threads are only needed for concurrent scans
+            from multiprocessing.pool import ThreadPool
+
+            pool = ThreadPool(min(self.workers, len(paths)))
+            try:
+                return pool.map(_list_dir, paths)
+            finally:
+                pool.close()
+                pool.join()
+        return [_list_dir(path) for path in paths]
+
     def _add_config_file(self, config_files, path, name):
         filename = os.path.join(path, "{0}.cfg".format(name.lower()))
         if os.path.exists(filename):
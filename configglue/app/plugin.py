@@ -13,15 +13,88 @@
 # For bug reports, support, and new releases: http://launchpad.net/configglue
 #
 ###############################################################################
+from importlib import import_module
+
 from configglue.schema import Schema
 
 
 __all__ = [
     'Plugin',
+    'PluginList',
     'PluginManager',
 ]
 
 
+def plugin_name(plugin):
+    """Return the name a plugin is registered under.
+
+    *plugin* is either a plugin class or a 'module:ClassName' reference to
+    one.
+
+    """
+    if isinstance(plugin, type):
+        return plugin.__name__
+    return plugin.rpartition(':')[2]
+
+
+def plugin_reference(plugin):
+    """Return the 'module:ClassName' reference to a plugin."""
+    if isinstance(plugin, type):
+        return '{0}:{1}'.format(plugin.__module__, plugin.__name__)
+    return plugin
+
+
+def load_plugin(reference):
+    """Import and return the plugin class a 'module:ClassName' refers to."""
+    module_name, _, class_name = reference.partition(':')
+    return getattr(import_module(module_name), class_name)
+
+
+class PluginList(list):
+    """A list of plugin classes, importing plugins registered by reference.
+
+    Plugins registered by reference are kept as their 'module:ClassName'
+    string until their item is read, when they are imported and replaced
+    by their class. Checking whether a plugin is in the list imports none.
+
+    """
+
+    def _load(self, index):
+        plugin = list.__getitem__(self, index)
+        if not isinstance(plugin, type):
+            plugin = load_plugin(plugin)
+            list.__setitem__(self, index, plugin)
+        return plugin
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._load(i) for i in range(*index.indices(len(self)))]
+        return self._load(index)
+
+    def __getslice__(self, start, stop):
+        # python 2 slicing
+        return self.__getitem__(slice(max(start, 0), max(stop, 0)))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._load(index)
+
+    def __contains__(self, plugin):
+        reference = plugin_reference(plugin)
+        return any(item is plugin or plugin_reference(item) == reference
+                   for item in self.references())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def references(self):
+        """Return the plugin classes, or references to them, as they are."""
+        return list(list.__iter__(self))
+
+
 class Plugin(object):
     schema = Schema
     enabled = False
@@ -29,16 +102,50 @@ class Plugin(object):
 
 class PluginManager(object):
     def __init__(self):
-        self.available = self.load()
+        self.available = []
+        for plugin in self.load():
+            self.register(plugin)
+
+    @property
+    def available(self):
+        """The available plugins, a PluginList."""
+        return self._available
+
+    @available.setter
+    def available(self, plugins):
+        self._available = PluginList(plugins)
+
+    @property
+    def names(self):
+        return [plugin_name(plugin)
+                for plugin in self._available.references()]
 
     @property
     def enabled(self):
-        return [cls for cls in self.available if cls.enabled]
+        # plugins not imported yet are disabled
+        return [cls for cls in self._available.references()
+                if isinstance(cls, type) and cls.enabled]
+
+    def _index(self, name):
+        for index, plugin in enumerate(self._available.references()):
+            if plugin_name(plugin) == name:
+                return index
+        raise KeyError(name)
+
+    def get(self, name):
+        return self._available[self._index(name)]
 
     def enable(self, plugin):
+        if not isinstance(plugin, type):
+            plugin = self.get(plugin)
         plugin.enabled = True
 
     def disable(self, plugin):
+        if not isinstance(plugin, type):
+            plugin = self._available.references()[self._index(plugin)]
+            if not isinstance(plugin, type):
+                # never imported, so it can't be enabled
+                return
         plugin.enabled = False
 
     @property
@@ -49,5 +156,14 @@ class PluginManager(object):
         return []
 
     def register(self, plugin):
-        if plugin not in self.available:
-            self.available.append(plugin)
+        try:
+            registered = self._available.references()[
+                self._index(plugin_name(plugin))]
+        except KeyError:
+            self._available.append(plugin)
+            return
+        if (registered is not plugin and
+                plugin_reference(registered) != plugin_reference(plugin)):
+            raise ValueError(
+                "A different plugin is already registered as {0!r}".format(
+                    plugin_name(plugin)))
@@ -0,0 +1,133 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import absolute_import
+
+import argparse
+import sys
+from collections import namedtuple
+from functools import partial
+
+from .glue import (
+    LazyValues,
+    _get_value,
+    _option_table,
+    resolve_overrides,
+)
+
+
+__all__ = [
+    'schemaargparseglue',
+]
+
+
+ArgparseGlue = namedtuple("ArgparseGlue",
+    "schema_parser argument_parser namespace command")
+
+
+class ArgumentSpec(object):
+    """The arguments to ArgumentParser.add_argument for a schema option."""
+
+    def __init__(self, *args, **kwargs):
+        help = kwargs.get('help')
+        if help:
+            # argparse expands %(default)s instead of optparse's %default
+            kwargs['help'] = help.replace('%', '%%').replace(
+                '%%default', '%(default)s')
+        self.args = args
+        self.kwargs = kwargs
+
+    @property
+    def shows_default(self):
+        return '%(default)s' in self.kwargs.get('help', '')
+
+
+def _add_arguments(parser, ap):
+    """Add the options of the parser's schema to an ArgumentParser.
+
+    Return the list of (section, options) tuples and the lazy defaults of
+    the options added.
+
+    """
+    schema = parser.schema
+    sections = [(section, section.options()) for section in schema.sections()]
+    table = _option_table(sections, ArgumentSpec)
+
+    lazy_defaults = {}
+    for (section, options), specs in zip(sections, table):
+        if section.name == '__main__':
+            group = ap
+        else:
+            group = ap.add_argument_group(section.name)
+        for option, spec in zip(options, specs):
+            get_default = partial(_get_value, parser, section, option)
+            if spec.shows_default:
+                # the default is displayed as part of the help
+                default = get_default()
+            else:
+                # keep the option out of the namespace unless given
+                default = argparse.SUPPRESS
+            action = group.add_argument(*spec.args, default=default,
+                                        **spec.kwargs)
+            if default is argparse.SUPPRESS:
+                lazy_defaults[action.dest] = get_default
+    return sections, lazy_defaults
+
+
+def schemaargparseglue(parser, ap=None, argv=None, commands=None):
+    """Glue an argparse ArgumentParser with a SchemaConfigParser.
+
+    The ArgumentParser is populated with options taken from the
+    SchemaConfigParser, following the same precedence rules as
+    schemaconfigglue.
+
+    *commands* maps subcommand names to callables returning the
+    SchemaConfigParser for each subcommand. The subcommand is given as the
+    first positional argument; only the selected subcommand's callable is
+    invoked and only its options are registered, in an ArgumentParser of
+    its own which parses the arguments following the subcommand name.
+
+    Return an ArgparseGlue, whose *command* is the ArgparseGlue for the
+    selected subcommand, if any.
+
+    """
+    if ap is None:
+        ap = argparse.ArgumentParser()
+    if argv is None:
+        argv = sys.argv[1:]
+    sections, lazy_defaults = _add_arguments(parser, ap)
+    if commands:
+        ap.add_argument('command', choices=list(commands))
+        ap.add_argument('command_args', nargs=argparse.REMAINDER,
+                        help=argparse.SUPPRESS)
+
+    namespace = ap.parse_args(argv)
+    if commands:
+        command_argv = namespace.command_args
+        del namespace.command_args
+
+    values = LazyValues(vars(namespace), lazy_defaults)
+    resolve_overrides(parser, sections, values)
+    values.resolve_all()
+    vars(namespace).update(vars(values))
+
+    command = None
+    if commands:
+        name = namespace.command
+        command_ap = argparse.ArgumentParser(
+            prog='{0} {1}'.format(ap.prog, name))
+        command = schemaargparseglue(commands[name](), command_ap,
+                                     command_argv)
+    return ArgparseGlue(parser, ap, namespace, command)
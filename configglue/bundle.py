@@ -0,0 +1,156 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Config bundles: a tree of config files stored in a single file.
+
+A bundle holds a config file and every file it includes, directly or not,
+so SchemaConfigParser.read resolves the whole include tree from a single
+read of the bundle. A bundle starts with BUNDLE_MAGIC and a line holding
+the JSON index of its files, followed by the content of the files:
+
+    #configglue-bundle 1
+    {"entry": "main.cfg", "files": [["main.cfg", 0, 42], ...]}
+    [__main__]
+    includes = local.cfg
+    ...
+
+Files are indexed by their path relative to the directory of the entry
+file, and read back relative to the directory of the bundle. Offsets and
+lengths count characters of the decoded content following the index line.
+
+Build a bundle with:
+
+    python -m configglue.bundle main.cfg main.cfgbundle
+
+"""
+import argparse
+import collections
+import io
+import json
+import os
+import sys
+
+from .parser import (
+    BUNDLE_MAGIC,
+    CONFIG_FILE_ENCODING,
+    SchemaConfigParser,
+)
+from .schema import Schema
+
+
+__all__ = [
+    'build_bundle',
+    'collect_files',
+    'load_bundle',
+    'write_bundle',
+]
+
+
+def load_bundle(content, path):
+    """Return the entry file and the files of a bundle.
+
+    *content* is the decoded content of the bundle stored at *path*. Return
+    the path of the entry file and a dict mapping the normalized path of
+    every file in the bundle to its content.
+
+    Raise ValueError if content is not a valid bundle.
+
+    """
+    if not content.startswith(BUNDLE_MAGIC):
+        raise ValueError("Not a config bundle: %s" % path)
+    index_end = content.find('\n', len(BUNDLE_MAGIC))
+    try:
+        index = json.loads(content[len(BUNDLE_MAGIC):index_end])
+        entry, files = index['entry'], index['files']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid config bundle index in %s" % path)
+
+    data_start = index_end + 1
+    basedir = os.path.dirname(path)
+    sources = {}
+    for name, offset, length in files:
+        start = data_start + offset
+        sources[os.path.normpath(os.path.join(basedir, name))] = (
+            content[start:start + length])
+    return os.path.join(basedir, entry), sources
+
+
+class _CollectingParser(SchemaConfigParser):
+    """A SchemaConfigParser keeping the content of every file it reads."""
+
+    def _read_path(self, path):
+        content = super(_CollectingParser, self)._read_path(path)
+        if content is not None:
+            self._sources[os.path.normpath(path)] = content
+        return content
+
+
+def collect_files(entry):
+    """Return the content of a config file and of the files it includes.
+
+    Return an OrderedDict mapping the normalized path of each file to its
+    content, in the order the files are read.
+
+    """
+    parser = _CollectingParser(Schema())
+    parser._sources = collections.OrderedDict()
+    if not parser.read(entry):
+        raise IOError("Unable to read %s" % entry)
+    return parser._sources
+
+
+def build_bundle(entry):
+    """Return the bundle of a config file and the files it includes."""
+    basedir = os.path.dirname(entry) or os.curdir
+    index = []
+    contents = []
+    offset = 0
+    for path, content in collect_files(entry).items():
+        index.append((os.path.relpath(path, basedir), offset, len(content)))
+        contents.append(content)
+        offset += len(content)
+    header = json.dumps({
+        'entry': os.path.relpath(entry, basedir),
+        'files': index,
+    })
+    return ''.join([BUNDLE_MAGIC, header, '\n'] + contents)
+
+
+def write_bundle(entry, path):
+    """Store the bundle of a config file and its includes in path."""
+    content = build_bundle(entry)
+    tmp_path = '{0}.new'.format(path)
+    # keep line endings, as offsets count them
+    with io.open(tmp_path, 'w', encoding=CONFIG_FILE_ENCODING,
+                 newline='') as fp:
+        fp.write(content)
+    os.rename(tmp_path, path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog='python -m configglue.bundle',
+        description="Build a bundle holding a config file and all the "
+                    "files it includes.")
+    ap.add_argument('entry', help="the config file to bundle")
+    ap.add_argument('output', help="where to write the bundle")
+    args = ap.parse_args(argv)
+    write_bundle(args.entry, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
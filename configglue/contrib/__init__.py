@@ -13,6 +13,10 @@
 # For bug reports, support, and new releases: http://launchpad.net/configglue
 #
 ###############################################################################
+from configglue._lazy import lazy_module
 
-# import all schemas
-from .schema import *
+from .schema import __all__
+
+
+# all schemas are available from here too, imported on first use
+lazy_module(__name__, dict((name, '.schema') for name in __all__))
@@ -13,15 +13,20 @@
 # For bug reports, support, and new releases: http://launchpad.net/configglue
 #
 ###############################################################################
+from configglue._lazy import lazy_module
 
-from .devserver import DevServerSchema
-from .django_jenkins import DjangoJenkinsSchema
-from .nexus import NexusSchema
-from .django_openid_auth import DjangoOpenIdAuthSchema
-from .preflight import PreflightSchema
-from .saml2idp import Saml2IdpSchema
-from .raven import RavenSchema
-from .pystatsd import PyStatsdSchema
+
+# schema name -> module defining it; the module is imported on first use
+_schemas = {
+    'DevServerSchema': '.devserver',
+    'DjangoJenkinsSchema': '.django_jenkins',
+    'NexusSchema': '.nexus',
+    'DjangoOpenIdAuthSchema': '.django_openid_auth',
+    'PreflightSchema': '.preflight',
+    'Saml2IdpSchema': '.saml2idp',
+    'RavenSchema': '.raven',
+    'PyStatsdSchema': '.pystatsd',
+}
 
 
 __all__ = [
@@ -34,3 +39,5 @@ __all__ = [
     'RavenSchema',
     'PyStatsdSchema',
     ]
+
+lazy_module(__name__, _schemas)
@@ -0,0 +1,255 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""A local daemon serving parsed configs to the processes of a host.
+
+The daemon reads a config with a SchemaConfigParser once, and serves a
+snapshot of its parsed values (see configglue.snapshot) over a Unix domain
+socket. Each snapshot has a version, increased whenever the config files
+change; clients send the version they hold and only get a snapshot back
+when there's a newer one, so processes get their whole config in a single
+round trip without reading any file. Versions start from the time the
+daemon started, so a restarted daemon doesn't reuse them.
+
+The protocol is line based. A client sends::
+
+    GET <version>\\n
+
+and the daemon answers with the current version and the length of the
+snapshot that follows, which is 0 if the client's version is current::
+
+    <version> <length>\\n<snapshot>
+
+Start a daemon with:
+
+    python -m configglue.daemon SOCKET module:SchemaClass FILE...
+
+"""
+import argparse
+import collections
+import os
+import socket
+import sys
+import threading
+import time
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+from .bundle import _CollectingParser
+from .parser import LazyLogger
+from .schema import load_schema
+from .snapshot import Snapshot, dump_snapshot
+
+
+__all__ = [
+    'ConfigClient',
+    'ConfigServer',
+    'ConfigStore',
+]
+
+logger = LazyLogger(__name__)
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class ConfigStore(object):
+    """The versioned snapshot of a config.
+
+    The config files are checked for changes at most every
+    *check_interval* seconds, when the snapshot is requested; a snapshot is
+    only made a new version when its values change. When the files can't be
+    read, the error is logged and the last good snapshot is kept.
+
+    """
+
+    def __init__(self, schema, filenames, check_interval=1.0):
+        self.schema = schema
+        self.filenames = filenames
+        self.check_interval = check_interval
+        # milliseconds since the epoch, so a client holding the version of
+        # a previous daemon never matches a version of this one
+        self.version = int(time.time() * 1000)
+        self.snapshot = None
+        self._mtimes = {}
+        self._checked = 0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Read the config files again; return the current version.
+
+        Errors are only raised when there is no snapshot yet.
+
+        """
+        with self._lock:
+            parser = _CollectingParser(self.schema)
+            parser._sources = collections.OrderedDict()
+            try:
+                parser.read(self.filenames)
+                snapshot = dump_snapshot(parser)
+            except Exception:
+                if self.snapshot is None:
+                    raise
+                logger.exception("Error reading %s, keeping version %d",
+                                 ', '.join(self.filenames), self.version)
+                snapshot = self.snapshot
+            finally:
+                # watch the files read, including the ones missing so far
+                paths = set(parser._sources)
+                paths.update(os.path.normpath(path)
+                             for path in self.filenames)
+                self._mtimes = dict((path, _mtime(path)) for path in paths)
+                self._checked = time.time()
+
+            if snapshot != self.snapshot:
+                self.snapshot = snapshot
+                self.version += 1
+            return self.version
+
+    def changed(self):
+        """Return whether any of the config files changed."""
+        return any(_mtime(path) != mtime
+                   for path, mtime in self._mtimes.items())
+
+    def current(self):
+        """Return the current version and snapshot."""
+        if time.time() - self._checked >= self.check_interval:
+            self._checked = time.time()
+            if self.changed():
+                self.reload()
+        return self.version, self.snapshot
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = self.rfile.readline().split()
+        try:
+            command, version = request
+            version = int(version)
+        except ValueError:
+            self.wfile.write(b'ERROR invalid request\n')
+            return
+        if command != b'GET':
+            self.wfile.write(b'ERROR unknown command\n')
+            return
+
+        current, snapshot = self.server.store.current()
+        if version == current:
+            snapshot = b''
+        header = '{0} {1}\n'.format(current, len(snapshot))
+        self.wfile.write(header.encode('ascii') + snapshot)
+
+
+class ConfigServer(socketserver.ThreadingMixIn,
+                   socketserver.UnixStreamServer):
+    """Serve the snapshots of a ConfigStore over a Unix domain socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, store):
+        self.store = store
+        if os.path.exists(socket_path):
+            # left behind by a previous daemon
+            os.remove(socket_path)
+        socketserver.UnixStreamServer.__init__(self, socket_path,
+                                               _RequestHandler)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class ConfigClient(object):
+    """Fetch config snapshots from a ConfigServer.
+
+    The last snapshot fetched is kept, and only replaced when the daemon
+    has a newer version.
+
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.version = 0
+        self.snapshot = None
+
+    def fetch(self):
+        """Return the current Snapshot of the config."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            request = 'GET {0}\n'.format(self.version)
+            sock.sendall(request.encode('ascii'))
+            fp = sock.makefile('rb')
+            try:
+                header = fp.readline().split()
+                if len(header) != 2 or header[0] == b'ERROR':
+                    raise IOError("Invalid reply from config daemon at %s" %
+                                  self.socket_path)
+                version, length = int(header[0]), int(header[1])
+                if length:
+                    data = fp.read(length)
+                    if len(data) != length:
+                        raise IOError("Truncated reply from config daemon "
+                                      "at %s" % self.socket_path)
+                    self.snapshot = Snapshot.from_bytes(data)
+                    self.version = version
+            finally:
+                fp.close()
+        finally:
+            sock.close()
+        return self.snapshot
+
+    def values(self, section=None):
+        """Return the current values of the config."""
+        return self.fetch().values(section)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog='python -m configglue.daemon',
+        description="Serve parsed configs over a Unix domain socket.")
+    ap.add_argument('socket', help="path of the socket to listen on")
+    ap.add_argument('schema', help="the schema class, as module:ClassName")
+    ap.add_argument('files', nargs='+', help="the config files to serve")
+    ap.add_argument('--check-interval', type=float, default=1.0,
+                    help="seconds between checks for changed config files")
+    args = ap.parse_args(argv)
+
+    store = ConfigStore(load_schema(args.schema)(), args.files,
+                        check_interval=args.check_interval)
+    server = ConfigServer(args.socket, store)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
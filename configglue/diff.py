@@ -0,0 +1,137 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Differences between the raw state of two SchemaConfigParsers."""
+from collections import namedtuple
+
+from ._compat import DEFAULTSECT
+
+
+__all__ = [
+    'Change',
+    'apply_patch',
+    'changed_sections',
+    'diff',
+    'section_digests',
+]
+
+
+# a changed option; *old* and *new* are the raw values of the option, or
+# None if the option is missing from that side. *location* is the file the
+# option was last defined in, on the side where it is defined.
+Change = namedtuple("Change", "section option old new location")
+
+
+def _raw_sections(parser):
+    """Return a dict with the raw options of each section of a parser."""
+    sections = {}
+    if parser._defaults:
+        sections[DEFAULTSECT] = parser._defaults
+    for name, options in parser._sections.items():
+        options = dict(options)
+        # python 2 keeps the section name along with the options
+        options.pop('__name__', None)
+        sections[name] = options
+    return sections
+
+
+def _digest(options):
+    # import here to keep importing configglue fast
+    import hashlib
+
+    items = sorted(options.items(), key=lambda item: item[0])
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+
+def section_digests(parser):
+    """Return a dict with a digest of the raw options of each section.
+
+    Digests are stable across processes and hosts, so the digests of two
+    parsers can be compared without having both parsers at hand.
+
+    """
+    return dict((name, _digest(options))
+                for name, options in _raw_sections(parser).items())
+
+
+def changed_sections(old_digests, new_digests):
+    """Return the names of the sections whose digests differ."""
+    names = set(old_digests) | set(new_digests)
+    return sorted(name for name in names
+                  if old_digests.get(name) != new_digests.get(name))
+
+
+def diff(old, new, sections=None):
+    """Return the list of Changes turning parser *old* into parser *new*.
+
+    Only raw values are compared; nothing is parsed or interpolated.
+
+    If *sections* is given, only those sections are compared, e.g. the
+    result of changed_sections for the parsers' digests.
+
+    """
+    old_sections = _raw_sections(old)
+    new_sections = _raw_sections(new)
+    if sections is None:
+        sections = sorted(set(old_sections) | set(new_sections))
+    changes = []
+    for name in sections:
+        old_options = old_sections.get(name, {})
+        new_options = new_sections.get(name, {})
+        if old_options == new_options:
+            continue
+        for option in sorted(set(old_options) | set(new_options)):
+            if option not in new_options:
+                changes.append(Change(name, option, old_options[option],
+                                      None, old.locate(option)))
+            elif (option not in old_options or
+                    old_options[option] != new_options[option]):
+                changes.append(Change(name, option, old_options.get(option),
+                                      new_options[option],
+                                      new.locate(option)))
+    return changes
+
+
+def apply_patch(parser, changes):
+    """Apply a list of Changes to a parser, in place.
+
+    Only the raw values of the changed options are touched; values are
+    parsed when they are looked up, so nothing else needs refreshing.
+
+    Options set or removed by the patch are recorded as dirty at their
+    location in the parser, or in the last file it read, so that save()
+    writes them back to its own files.
+
+    """
+    for change in changes:
+        if change.section == DEFAULTSECT:
+            options = parser._defaults
+        elif parser.has_section(change.section):
+            options = parser._sections[change.section]
+        elif change.new is None:
+            # nothing to remove
+            continue
+        else:
+            parser.add_section(change.section)
+            options = parser._sections[change.section]
+        if change.new is None:
+            if change.option not in options:
+                continue
+            del options[change.option]
+        else:
+            options[change.option] = change.new
+        location = parser.locate(change.option)
+        parser._dirty[location][change.section][change.option] = change.new
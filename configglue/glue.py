@@ -14,10 +14,12 @@
 #
 ###############################################################################
 
+import copy
 import os
 import sys
-from optparse import OptionParser
+from optparse import OptionParser, Values
 from collections import namedtuple
+from functools import partial
 
 from ._compat import NoSectionError, NoOptionError
 from .parser import SchemaConfigParser
@@ -32,6 +34,189 @@ __all__ = [
 SchemaGlue = namedtuple("SchemaGlue",
     "schema_parser option_parser options args")
 
+# prefix of the environment variables overriding option values
+ENV_PREFIX = 'CONFIGGLUE_'
+
+# command line option templates, by schema fingerprint and option class
+_option_tables = {}
+
+
+class LazyValues(Values, object):
+    """Command line values that resolve schema defaults on first access.
+
+    Schema defaults are only looked up in the parser for options that were
+    not given on the command line, and only once they are actually needed.
+
+    """
+    __slots__ = ['_lazy_defaults']
+
+    def __init__(self, defaults=None, lazy_defaults=None):
+        self._lazy_defaults = lazy_defaults or {}
+        Values.__init__(self, defaults)
+
+    def __getattr__(self, name):
+        if name == '_lazy_defaults':
+            raise AttributeError(name)
+        try:
+            get_default = self._lazy_defaults.pop(name)
+        except KeyError:
+            raise AttributeError(name)
+        value = get_default()
+        setattr(self, name, value)
+        return value
+
+    def __str__(self):
+        self.resolve_all()
+        return Values.__str__(self)
+
+    def __eq__(self, other):
+        self.resolve_all()
+        if isinstance(other, Values):
+            return self.__dict__ == other.__dict__
+        elif isinstance(other, dict):
+            return self.__dict__ == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def is_resolved(self, name):
+        """Return whether name holds a value instead of a pending default."""
+        return name in self.__dict__
+
+    def resolve_all(self):
+        """Look up all the pending defaults."""
+        for name in list(self._lazy_defaults):
+            if not self.is_resolved(name):
+                getattr(self, name)
+        self._lazy_defaults.clear()
+
+
+def long_name(option):
+    """Return the command line name of a schema option."""
+    if option.section.name == '__main__':
+        return option.name
+    return option.section.name + '_' + option.name
+
+
+def opt_name(option):
+    """Return the attribute name of a schema option in the parsed values."""
+    return long_name(option).replace('-', '_')
+
+
+def schema_fingerprint(sections):
+    """Return a digest of the command line options of a schema.
+
+    *sections* is a list of (section, options) tuples.
+
+    """
+    # import here to keep importing configglue fast
+    import hashlib
+
+    items = [(section.name, [(option.name, option.short_name, option.help,
+                              option.action) for option in options])
+             for section, options in sections]
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+
+def _option_table(sections, option_class):
+    """Return the command line option templates for a schema.
+
+    The result is a list with an option template list per section, in the
+    same order as *sections*; it is built only once per schema fingerprint
+    and option class.
+
+    """
+    key = (schema_fingerprint(sections), option_class)
+    table = _option_tables.get(key)
+    if table is None:
+        table = []
+        for section, options in sections:
+            templates = []
+            for option in options:
+                kwargs = {'action': option.action}
+                if option.help:
+                    kwargs['help'] = option.help
+                args = ['--' + long_name(option)]
+                if option.short_name:
+                    # prepend the option's short name
+                    args.insert(0, '-' + option.short_name)
+                templates.append(option_class(*args, **kwargs))
+            table.append(templates)
+        _option_tables[key] = table
+    return table
+
+
+def _get_value(parser, section, option):
+    try:
+        return parser.get(section.name, option.name)
+    except (NoSectionError, NoOptionError):
+        return None
+
+
+def _set_value(parser, section, option, value):
+    # if value is not of the right type, cast it
+    if not option.validate(value):
+        kwargs = {}
+        if option.require_parser:
+            kwargs['parser'] = parser
+        value = option.parse(value, **kwargs)
+    parser.set(section.name, option.name, value)
+
+
+def environ_overrides(environ=None):
+    """Return the option overrides found in the environment.
+
+    The result maps the upper case command line name of each option to the
+    value of its CONFIGGLUE_ environment variable.
+
+    """
+    if environ is None:
+        environ = os.environ
+    start = len(ENV_PREFIX)
+    return dict((name[start:], value) for name, value in environ.items()
+                if name.startswith(ENV_PREFIX))
+
+
+def resolve_overrides(parser, sections, options, environ=None):
+    """Update parser with the command line and environment overrides.
+
+    The precedence rules are:
+
+    1. Explicitly defined via command-line
+    2. Implicitly defined via environment variable
+    3. Explicitly defined via configuration files
+    4. Implicitly defined via schema defaults
+
+    *sections* is a list of (section, options) tuples and *options* the
+    LazyValues returned by the OptionParser. Only options given on the
+    command line or in the environment are looked up in the parser.
+
+    """
+    overrides = environ_overrides(environ)
+    for section, section_options in sections:
+        for option in section_options:
+            dest = opt_name(option)
+            from_cli = options.is_resolved(dest)
+            env_value = overrides.get(long_name(option).upper())
+            if not from_cli and env_value is None:
+                # option keeps its value from the configuration files
+                continue
+
+            if from_cli:
+                parser_value = _get_value(parser, section, option)
+                op_value = getattr(options, dest)
+                if op_value != parser_value:
+                    _set_value(parser, section, option, op_value)
+                    continue
+            else:
+                # the pending default is the value from the files
+                parser_value = getattr(options, dest)
+            if env_value is not None and env_value != parser_value:
+                _set_value(parser, section, option, env_value)
+
 
 def schemaconfigglue(parser, op=None, argv=None):
     """Glue an OptionParser with a SchemaConfigParser.
@@ -39,75 +224,49 @@ def schemaconfigglue(parser, op=None, argv=None):
     The OptionParser is populated with options and defaults taken from the
     SchemaConfigParser.
 
-    """
-    def long_name(option):
-        if option.section.name == '__main__':
-            return option.name
-        return option.section.name + '_' + option.name
-
-    def opt_name(option):
-        return long_name(option).replace('-', '_')
+    Defaults are only looked up once the command line has been parsed,
+    except for options whose help displays them.
 
+    """
     if op is None:
         op = OptionParser()
     if argv is None:
         argv = sys.argv[1:]
     schema = parser.schema
+    sections = [(section, section.options()) for section in schema.sections()]
+    table = _option_table(sections, op.option_class)
 
-    for section in schema.sections():
+    default_tag = getattr(op.formatter, 'default_tag', None)
+    lazy_defaults = {}
+    for (section, options), templates in zip(sections, table):
         if section.name == '__main__':
             og = op
         else:
             og = op.add_option_group(section.name)
-        for option in section.options():
-            kwargs = {}
-            if option.help:
-                kwargs['help'] = option.help
-            try:
-                kwargs['default'] = parser.get(section.name, option.name)
-            except (NoSectionError, NoOptionError):
-                pass
-            kwargs['action'] = option.action
-            args = ['--' + long_name(option)]
-            if option.short_name:
-                # prepend the option's short name
-                args.insert(0, '-' + option.short_name)
-            og.add_option(*args, **kwargs)
-    options, args = op.parse_args(argv)
-
-    def set_value(section, option, value):
-        # if value is not of the right type, cast it
-        if not option.validate(value):
-            kwargs = {}
-            if option.require_parser:
-                kwargs['parser'] = parser
-            value = option.parse(value, **kwargs)
-        parser.set(section.name, option.name, value)
-
-    for section in schema.sections():
-        for option in section.options():
-            op_value = getattr(options, opt_name(option))
-            try:
-                parser_value = parser.get(section.name, option.name)
-            except (NoSectionError, NoOptionError):
-                parser_value = None
-            env_value = os.environ.get("CONFIGGLUE_{0}".format(
-                long_name(option).upper()))
-
-            # 1. op value != parser value
-            # 2. op value == parser value != env value
-            # 3. op value == parser value == env value or not env value
-
-            # if option is fatal, op_value will be None, so skip this case too
-            if op_value != parser_value and not option.fatal:
-                set_value(section, option, op_value)
-            elif env_value is not None and env_value != parser_value:
-                set_value(section, option, env_value)
+        for option, template in zip(options, templates):
+            opt = copy.copy(template)
+            og.add_option(opt)
+            get_default = partial(_get_value, parser, section, option)
+            if default_tag and opt.help and default_tag in opt.help:
+                # the default is displayed as part of the help
+                op.set_default(opt.dest, get_default())
+            else:
+                lazy_defaults[opt.dest] = get_default
+
+    defaults = dict((name, value)
+                    for name, value in vars(op.get_default_values()).items()
+                    if name not in lazy_defaults)
+    values = LazyValues(defaults, lazy_defaults)
+    options, args = op.parse_args(argv, values)
+
+    resolve_overrides(parser, sections, options)
+    options.resolve_all()
 
     return op, options, args
 
 
-def configglue(schema_class, configs, op=None, validate=False):
+def configglue(schema_class, configs, op=None, validate=False,
+               help_index=None, workers=None):
     """Parse configuration files using a provided schema.
 
     The standard workflow for configglue is to instantiate a schema class,
@@ -115,9 +274,23 @@ def configglue(schema_class, configs, op=None, validate=False):
     This utility function executes this standard worfklow so you don't have
     to repeat yourself.
 
+    If *help_index* is the path of a help index file and the command line
+    asks for --help, the help is printed from that file (created if needed)
+    without reading any configuration file.
+
+    If *workers* is greater than 1, the configuration files are read
+    concurrently by up to that many threads.
+
     """
+    if help_index is not None:
+        # import here to avoid circular imports
+        from .helpindex import HelpIndex, help_requested
+        if help_requested(sys.argv[1:]):
+            HelpIndex.cached(help_index, schema_class).print_help(op)
+            sys.exit(0)
+
     scp = SchemaConfigParser(schema_class())
-    scp.read(configs)
+    scp.read(configs, workers=workers)
     parser, opts, args = schemaconfigglue(scp, op=op)
     if validate or getattr(opts, 'validate', False):
         is_valid, reasons = scp.is_valid(report=True)
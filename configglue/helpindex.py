@@ -0,0 +1,217 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Precomputed --help output for a schema.
+
+A HelpIndex holds everything needed to render the command line help of a
+schema: option names, short names, help text and default values. It can be
+stored on disk and rendered without reading any configuration file or
+populating an OptionParser with the schema options.
+
+"""
+import copy
+import json
+import os
+import sys
+from optparse import Option, OptionGroup, OptionParser
+
+from ._compat import text_type
+from .glue import long_name, opt_name, schema_fingerprint
+
+
+__all__ = [
+    'HelpIndex',
+    'help_requested',
+]
+
+HELP_INDEX_VERSION = 1
+
+
+def help_requested(argv):
+    """Return whether argv asks for the command line help."""
+    for arg in argv:
+        if arg == '--':
+            break
+        if arg in ('-h', '--help'):
+            return True
+    return False
+
+
+def _class_name(cls):
+    return '{0}.{1}'.format(cls.__module__, cls.__name__)
+
+
+def _source_mtime(schema_class):
+    """Return the last modification time of the modules defining a class."""
+    mtime = 0
+    for cls in schema_class.__mro__:
+        module = sys.modules.get(cls.__module__)
+        filename = getattr(module, '__file__', None)
+        if filename is not None:
+            mtime = max(mtime, os.path.getmtime(filename))
+    return mtime
+
+
+class HelpOption(object):
+    """The part of an optparse Option needed to format its help."""
+
+    metavar = None
+
+    def __init__(self, long_name, short_name, dest, takes_value, help):
+        self._long_opts = ['--' + long_name]
+        self._short_opts = ['-' + short_name] if short_name else []
+        self.dest = dest
+        self._takes_value = takes_value
+        self.help = help
+
+    def takes_value(self):
+        return self._takes_value
+
+
+class HelpIndex(object):
+    """The command line help of a schema.
+
+    *sections* is a list of (section name, options) tuples, where options
+    is a list of (long name, short name, dest, takes value, help, default)
+    tuples; defaults are strings, or None for options without one.
+
+    """
+
+    def __init__(self, sections, schema='', fingerprint=''):
+        self.sections = sections
+        self.schema = schema
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_schema(cls, schema):
+        """Return the help index of a schema instance."""
+        sections = [(section, section.options())
+                    for section in schema.sections()]
+        index = []
+        for section, options in sections:
+            items = []
+            for option in options:
+                default = None
+                if not option.fatal and option.default is not None:
+                    default = text_type(option.default)
+                takes_value = option.action in Option.ALWAYS_TYPED_ACTIONS
+                items.append((long_name(option), option.short_name,
+                              opt_name(option), takes_value, option.help,
+                              default))
+            index.append((section.name, items))
+        return cls(index, schema=_class_name(type(schema)),
+                   fingerprint=schema_fingerprint(sections))
+
+    @classmethod
+    def load(cls, path):
+        """Return the help index stored in a file.
+
+        Raise ValueError if the file does not hold a help index in the
+        current format.
+
+        """
+        with open(path) as fp:
+            data = json.load(fp)
+        if data.get('version') != HELP_INDEX_VERSION:
+            raise ValueError("Unsupported help index version in %s" % path)
+        sections = [(name, [tuple(item) for item in items])
+                    for name, items in data['sections']]
+        return cls(sections, schema=data['schema'],
+                   fingerprint=data['fingerprint'])
+
+    @classmethod
+    def cached(cls, path, schema_class):
+        """Return the help index of a schema class, stored in a file.
+
+        The index is built and saved to path when the file is missing,
+        belongs to a different schema class, doesn't match the options of
+        the schema or is older than any module defining the schema class.
+
+        """
+        schema = schema_class()
+        fingerprint = schema_fingerprint(
+            [(section, section.options()) for section in schema.sections()])
+        try:
+            if os.path.getmtime(path) >= _source_mtime(schema_class):
+                index = cls.load(path)
+                # classes made by merge or ini2schema share their names
+                if (index.schema == _class_name(schema_class) and
+                        index.fingerprint == fingerprint):
+                    return index
+        except (IOError, OSError, ValueError, KeyError):
+            # missing or broken index; build a new one
+            pass
+
+        index = cls.from_schema(schema)
+        try:
+            index.save(path)
+        except (IOError, OSError):
+            # the index is only a cache
+            pass
+        return index
+
+    def save(self, path):
+        """Store the help index in a file."""
+        data = {
+            'version': HELP_INDEX_VERSION,
+            'schema': self.schema,
+            'fingerprint': self.fingerprint,
+            'sections': self.sections,
+        }
+        tmp_path = '{0}.new'.format(path)
+        with open(tmp_path, 'w') as fp:
+            fp.write(json.dumps(data))
+        os.rename(tmp_path, path)
+
+    def option_parser(self, op=None):
+        """Return a copy of op able to render the help of the schema.
+
+        The returned parser can only be used for formatting its help.
+
+        """
+        if op is None:
+            op = OptionParser()
+        help_parser = copy.copy(op)
+        help_parser.option_list = list(op.option_list)
+        help_parser.option_groups = list(op.option_groups)
+        help_parser.defaults = dict(op.defaults)
+        for name, items in self.sections:
+            options = []
+            for item in items:
+                long_name, short_name, dest, takes_value, help, default = item
+                options.append(
+                    HelpOption(long_name, short_name, dest, takes_value, help))
+                help_parser.defaults[dest] = default
+            if name == '__main__':
+                help_parser.option_list.extend(options)
+            else:
+                group = OptionGroup(help_parser, name)
+                group.option_list = options
+                help_parser.option_groups.append(group)
+
+        formatter = copy.copy(op.formatter)
+        formatter.option_strings = {}
+        formatter.set_parser(help_parser)
+        help_parser.formatter = formatter
+        return help_parser
+
+    def format_help(self, op=None):
+        """Return the help of op extended with the schema options."""
+        return self.option_parser(op).format_help()
+
+    def print_help(self, op=None, file=None):
+        """Print the help of op extended with the schema options."""
+        self.option_parser(op).print_help(file)
@@ -17,8 +17,6 @@
 """
 AttributtedConfigParser lives here.
 """
-import re
-
 from configglue._compat import RawConfigParser
 
 
@@ -55,15 +53,72 @@ class AttributedConfigParser(RawConfigParser, object):
         @param section: The section whose filtered options you want
         @return: A C{set} of option names, with attributes removed
         """
-        return set(re.sub(r'\..*', '', option)
+        return set(option.partition('.')[0]
                    for option in self.options(section))
 
+    def raw_items(self, section):
+        """ Return a dict with the section's options and their raw values.
+
+        Unlike items, this never interpolates values.
+
+        @param section: The section whose options you want
+        """
+        items = dict(self._defaults)
+        items.update(self._sections[section])
+        # python 2 keeps the section name along with the options
+        items.pop('__name__', None)
+        return items
+
     def parse_all(self):
         """ Go through all sections and options attempting to parse each one.
         """
         for section in self.sections():
-            for option in self.normalized_options(section):
-                self.parse(section, option)
+            self.parse_section(section)
+
+    def parse_section(self, section):
+        """Parse all the options in a single section.
+
+        The attributes are grouped by their base option in a single pass
+        over the section's options.
+
+        @param section: the section to parse
+        """
+        items = self.raw_items(section)
+        values = {}
+        attributes = []
+        for opt, val in items.items():
+            option, dot, attr = opt.partition('.')
+            if option not in values:
+                values[option] = ValueWithAttrs(items.get(option, marker))
+            if dot:
+                values[option].attrs[attr] = val
+                attributes.append(opt)
+        for opt in attributes:
+            self.remove_option(section, opt)
+        options = list(values)
+        processed = self.process_section(
+            [values[option] for option in options])
+        for option, value in zip(options, processed):
+            self.set(section, option, value)
+
+    def process_section(self, values):
+        """Return the parsed values of all the options in a section.
+
+        By default each value goes through L{process}; subclasses can
+        override this to process the values of a section together.
+
+        @param values: a list of L{ValueWithAttrs}
+        """
+        return [self.process(value) for value in values]
+
+    def process(self, value):
+        """Return a parsed value, once its attributes have been collected.
+
+        Subclasses can override this to transform the value.
+
+        @param value: the L{ValueWithAttrs} of an option
+        """
+        return value
 
     def parse(self, section, option):
         """Parse a single option in a single section.
@@ -80,3 +135,4 @@ class AttributedConfigParser(RawConfigParser, object):
             if opt.startswith(option + '.'):
                 value.attrs[opt[len(option) + 1:]] = val
                 self.remove_option(section, opt)
+        self.set(section, option, self.process(value))
@@ -18,7 +18,11 @@
 """
 from __future__ import absolute_import
 
+import hashlib
+import json
+import os
 from collections import namedtuple
+from io import StringIO
 
 from configglue._compat import builtins
 from configglue.inischema import parsers
@@ -36,6 +40,8 @@ from configglue.schema import (
 
 
 __all__ = [
+    'build_schema',
+    'compile_schema',
     'configglue',
     'ini2schema',
 ]
@@ -43,20 +49,38 @@ __all__ = [
 
 IniGlue = namedtuple("IniGlue", " option_parser options args")
 
+SCHEMA_CACHE_VERSION = 1
 
-def ini2schema(fd, p=None):
-    """
-    Turn a fd that refers to a INI-style schema definition into a
-    SchemaConfigParser object
+# the option attributes used to build a schema
+SCHEMA_ATTRS = ('parser', 'parser.args', 'short_name', 'help', 'action')
 
-    @param fd: file-like object to read the schema from
-    @param p: a parser to use. If not set, uses AttributedConfigParser
+
+def compile_schema(p):
+    """Return the definition of the schema described by a parsed INI file.
+
+    The definition is a list of (section name, options) tuples, where
+    options is a list of (option name, attributes) tuples. The attributes
+    are a dict holding the option value, if any, under 'value' along with
+    the option attributes needed to build the schema.
+
+    @param p: an AttributedConfigParser, after calling parse_all
     """
-    if p is None:
-        p = AttributedConfigParser()
-    p.readfp(fd)
-    p.parse_all()
+    definition = []
+    for section_name in p.sections():
+        options = []
+        for option_name in p.options(section_name):
+            option = p.get(section_name, option_name)
+            attrs = dict((name, option.attrs.pop(name))
+                         for name in SCHEMA_ATTRS if name in option.attrs)
+            if not option.is_empty:
+                attrs['value'] = option.value
+            options.append((option_name, attrs))
+        definition.append((section_name, options))
+    return definition
+
 
+def build_schema(definition):
+    """Return a Schema class from a definition built by compile_schema."""
     parser2option = {'unicode': StringOption,
                      'int': IntOption,
                      'bool': BoolOption,
@@ -65,17 +89,15 @@ def ini2schema(fd, p=None):
     class MySchema(Schema):
         pass
 
-    for section_name in p.sections():
+    for section_name, options in definition:
         if section_name == '__main__':
             section = MySchema
         else:
             section = Section(name=section_name)
             setattr(MySchema, section_name, section)
-        for option_name in p.options(section_name):
-            option = p.get(section_name, option_name)
-
-            parser = option.attrs.pop('parser', 'unicode')
-            parser_args = option.attrs.pop('parser.args', '').split()
+        for option_name, option in options:
+            parser = option.get('parser', 'unicode')
+            parser_args = option.get('parser.args', '').split()
             parser_fun = getattr(parsers, parser, None)
             if parser_fun is None:
                 parser_fun = getattr(builtins, parser, None)
@@ -83,15 +105,15 @@ def ini2schema(fd, p=None):
                 parser_fun = lambda x: x
 
             attrs = {'name': option_name}
-            option_short_name = option.attrs.pop('short_name', None)
+            option_short_name = option.get('short_name')
             if option_short_name is not None:
                 attrs['short_name'] = option_short_name
-            option_help = option.attrs.pop('help', None)
+            option_help = option.get('help')
             if option_help is not None:
                 attrs['help'] = option_help
-            if not option.is_empty:
-                attrs['default'] = parser_fun(option.value, *parser_args)
-            option_action = option.attrs.pop('action', None)
+            if 'value' in option:
+                attrs['default'] = parser_fun(option['value'], *parser_args)
+            option_action = option.get('action')
             if option_action is not None:
                 attrs['action'] = option_action
 
@@ -102,10 +124,91 @@ def ini2schema(fd, p=None):
                 instance = klass(**attrs)
             setattr(section, option_name, instance)
 
-    return SchemaConfigParser(MySchema())
+    return MySchema
+
+
+def load_definition(path):
+    """Return the schema definition stored in a file.
+
+    Raise ValueError if the file does not hold a definition in the current
+    format.
+
+    """
+    with open(path) as fp:
+        data = json.load(fp)
+    if data.get('version') != SCHEMA_CACHE_VERSION:
+        raise ValueError("Unsupported schema cache version in %s" % path)
+    return [(section_name, [tuple(option) for option in options])
+            for section_name, options in data['sections']]
+
+
+def save_definition(path, definition):
+    """Store a schema definition in a file."""
+    data = {
+        'version': SCHEMA_CACHE_VERSION,
+        'sections': definition,
+    }
+    tmp_path = '{0}.new'.format(path)
+    with open(tmp_path, 'w') as fp:
+        fp.write(json.dumps(data))
+    os.rename(tmp_path, path)
+
+
+def cached_definition(fd, cache_dir):
+    """Return the definition of the INI-style schema read from fd.
+
+    Definitions are stored in cache_dir, keyed by a hash of the schema
+    file's content, so the schema file is only parsed when its content
+    changes.
+
+    """
+    content = fd.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    path = os.path.join(cache_dir, '{0}.json'.format(digest))
+    try:
+        return load_definition(path)
+    except (IOError, OSError, ValueError, KeyError):
+        # missing or broken definition; compile the schema
+        pass
+
+    p = AttributedConfigParser()
+    p.readfp(StringIO(content))
+    p.parse_all()
+    definition = compile_schema(p)
+    try:
+        save_definition(path, definition)
+    except (IOError, OSError, TypeError):
+        # the definition is only a cache
+        pass
+    return definition
+
+
+def ini2schema(fd, p=None, cache_dir=None):
+    """
+    Turn a fd that refers to a INI-style schema definition into a
+    SchemaConfigParser object
+
+    @param fd: file-like object to read the schema from
+    @param p: a parser to use. If not set, uses AttributedConfigParser
+    @param cache_dir: a directory where compiled schema definitions are
+        cached. Only used when no parser is given.
+    """
+    if p is None and cache_dir is not None:
+        definition = cached_definition(fd, cache_dir)
+    else:
+        if p is None:
+            p = AttributedConfigParser()
+        p.readfp(fd)
+        p.parse_all()
+        definition = compile_schema(p)
+    return SchemaConfigParser(build_schema(definition)())
 
 
 def configglue(fileobj, *filenames, **kwargs):
     args = kwargs.pop('args', None)
-    parser, opts, args = schemaconfigglue(ini2schema(fileobj), argv=args)
+    cache_dir = kwargs.pop('cache_dir', None)
+    parser, opts, args = schemaconfigglue(
+        ini2schema(fileobj, cache_dir=cache_dir), argv=args)
     return IniGlue(parser, opts, args)
@@ -16,6 +16,8 @@
 
 """Parsers used by TypedConfigParser live here
 """
+from configglue._compat import string_types
+from configglue._scalars import make_bool_table, parse_bool, parse_bools
 
 
 def lines(value):
@@ -31,8 +33,8 @@ def lines(value):
     except AttributeError:
         return value
 
-_true_values = frozenset(('true', '1', 'on', 'yes'))
-_false_values = frozenset(('false', '0', 'off', 'no'))
+_bool_values = make_bool_table(('true', '1', 'on', 'yes'),
+                               ('false', '0', 'off', 'no'))
 
 
 def bool_parser(value):
@@ -44,13 +46,13 @@ def bool_parser(value):
     any other string else should raise an error; None and booleans are
     preserved.
     """
-    try:
-        value = value.lower()
-    except AttributeError:
+    if not isinstance(value, string_types):
         return bool(value)
-    else:
-        if value in _true_values:
-            return True
-        if value in _false_values:
-            return False
-    raise ValueError("Unable to determine boolosity of %r" % value)
+    return parse_bool(value, _bool_values)
+
+
+def bool_parsers(values):
+    """Return the boolosity of each one of values, as bool_parser would."""
+    if all(isinstance(value, string_types) for value in values):
+        return parse_bools(values, _bool_values)
+    return [bool_parser(value) for value in values]
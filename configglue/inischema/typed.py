@@ -20,6 +20,7 @@ from __future__ import absolute_import, unicode_literals
 import os
 
 from configglue._compat import text_type
+from configglue._scalars import parse_ints
 from . import parsers
 from .attributed import AttributedConfigParser
 
@@ -38,6 +39,11 @@ class TypedConfigParser(AttributedConfigParser):
                         'unicode': text_type,
                         'getenv': os.getenv,
                         None: lambda x: x}
+        # parsers converting a list of values in one call
+        self.batch_parsers = {'bool': parsers.bool_parsers,
+                              'int': parse_ints}
+        # (parser.args.parser, parser.args) -> parsed parser.args
+        self._args_cache = {}
 
     def add_parser(self, name, parser, clobber=False):
         """Add a custom parser
@@ -49,6 +55,9 @@ class TypedConfigParser(AttributedConfigParser):
         """
         if name not in self.parsers or clobber:
             self.parsers[name] = parser
+            # a batch parser for the name would no longer match
+            self.batch_parsers.pop(name, None)
+            self._args_cache.clear()
         else:
             raise ValueError('A parser by that name already exists')
 
@@ -60,19 +69,49 @@ class TypedConfigParser(AttributedConfigParser):
         for arg in args:
             self.add_parser(*arg)
 
-    def parse(self, section, option):
-        """Parse a single option in a single section.
+    def add_batch_parser(self, name, parser, clobber=False):
+        """Add a custom parser converting many values in one call
 
-        This actually consumes the 'parser', 'parser_args' and 'default'
-        attributes.
+        When parsing a whole section, all the values using the same parser
+        and parser arguments are converted with a single call to it.
 
-        @param section: the section within which to look for the option
-        @param option: the 'base' option to parse
+        @param name: the name with which you can ask for this parser
+                     in the configuration file
+        @param parser: the parser itself; it takes a list of values, plus
+                       any parser arguments, and returns the list of
+                       converted values
+        @param clobber: whether to overwite an existing parser
         """
-        super(TypedConfigParser, self).parse(section, option)
+        if name in self.batch_parsers and not clobber:
+            raise ValueError('A parser by that name already exists')
+        if name not in self.parsers or clobber:
+            self.parsers[name] = lambda value, *args: parser([value], *args)[0]
+        self.batch_parsers[name] = parser
 
-        value = self.get(section, option)
+    def parser_args(self, args_parser, args):
+        """Return the parsed parser.args, parsing each distinct one once.
+
+        @param args_parser: the name of the parser for the arguments
+        @param args: the unparsed arguments
+        """
+        key = (args_parser, args)
+        try:
+            return self._args_cache[key]
+        except KeyError:
+            parsed = self._args_cache[key] = tuple(
+                self.parsers[args_parser](args))
+            return parsed
+
+    def prepare(self, value):
+        """Set the default of a value, and return how to convert it.
+
+        This actually consumes the 'parser', 'parser_args' and 'default'
+        attributes.
 
+        @param value: the L{ValueWithAttrs} of an option
+        @return: the parser name, or None if the value needs no conversion,
+                 and the parser arguments
+        """
         if 'default.parser' in value.attrs:
             parser = self.parsers[value.attrs.pop('default.parser')]
             value.attrs['default'] = parser(value.attrs['default'])
@@ -83,16 +122,56 @@ class TypedConfigParser(AttributedConfigParser):
             else:
                 value.value = None
 
-        if 'parser' in value.attrs:
-            args = value.attrs.pop('parser.args', ())
-            if args != ():
-                args_parser = value.attrs.pop('parser.args.parser', 'lines')
-                args = self.parsers[args_parser](args)
-            # leave the parser hanging around for if you need it later
-            value.parser = self.parsers[value.attrs.pop('parser')]
-            value.value = value.parser(value.value, *args)
-        else:
+        if 'parser' not in value.attrs:
             value.parser = self.parsers[None]
+            return None, ()
+
+        args = value.attrs.pop('parser.args', ())
+        if args != ():
+            args_parser = value.attrs.pop('parser.args.parser', 'lines')
+            args = self.parser_args(args_parser, args)
+        # leave the parser hanging around for if you need it later
+        name = value.attrs.pop('parser')
+        value.parser = self.parsers[name]
+        return name, args
+
+    def process(self, value):
+        """Convert a value to its type.
+
+        @param value: the L{ValueWithAttrs} of an option
+        """
+        name, args = self.prepare(value)
+        if name is not None:
+            value.value = value.parser(value.value, *args)
 
         # tadaa!
-        self.set(section, option, value)
+        return value
+
+    def process_section(self, values):
+        """Convert the values of a section to their types.
+
+        Values sharing a parser and parser arguments are converted together,
+        in a single call when there is a batch parser for them.
+
+        @param values: a list of L{ValueWithAttrs}
+        """
+        batches = {}
+        for value in values:
+            name, args = self.prepare(value)
+            if name is not None:
+                # parsed arguments are shared through the cache, and may
+                # not be hashable
+                key = (name, id(args))
+                batches.setdefault(key, (name, args, []))[2].append(value)
+
+        for name, args, batch in batches.values():
+            raw_values = [value.value for value in batch]
+            batch_parser = self.batch_parsers.get(name)
+            if batch_parser is not None:
+                converted = batch_parser(raw_values, *args)
+            else:
+                parser = self.parsers[name]
+                converted = [parser(raw, *args) for raw in raw_values]
+            for value, result in zip(batch, converted):
+                value.value = result
+        return values
@@ -17,19 +17,27 @@
 import codecs
 import collections
 import copy
-import logging
+import fnmatch
+import io
 import os
 import re
+import stat
 
 from functools import reduce
 
 from ._compat import BaseConfigParser, text_type, string_types
 from ._compat import (
+    PY2,
     DEFAULTSECT,
     InterpolationMissingOptionError,
     NoOptionError,
     NoSectionError,
+    configparser,
 )
+from ._lexer import MISSING, apply_tokens, supports, tokenize
+from ._save import read_lines, save_files, update_lines
+from ._scalars import parse_bools, parse_ints
+from .schema import BoolOption, IntOption, Option
 
 
 __all__ = [
@@ -38,14 +46,182 @@ __all__ = [
 ]
 
 CONFIG_FILE_ENCODING = 'utf-8'
+# first line of config bundles, see configglue.bundle
+BUNDLE_MAGIC = '#configglue-bundle 1\n'
+# files read from included directories
+INCLUDE_DIR_PATTERN = '*.cfg'
+# version of the state pickled for SchemaConfigParser
+PARSER_STATE_VERSION = 1
+
+# returned by the internal lookups for options without a value
+_NOT_FOUND = object()
+# marks the fallback argument of SchemaConfigParser.get as not given
+_UNSET = object()
+
+# option types whose values can be parsed many at a time by parse_all
+BATCH_PARSERS = {
+    BoolOption: parse_bools,
+    IntOption: parse_ints,
+}
+
+class LazyLogger(object):
+    """The module logger, created on first use.
+
+    Importing logging is comparatively slow, and only needed when
+    something gets logged.
 
-class NullHandler(logging.Handler):
-    def emit(self, record):
-        pass
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._logger = None
+
+    def __getattr__(self, attr):
+        if self._logger is None:
+            import logging
+
+            self._logger = logging.getLogger(self._name)
+            self._logger.addHandler(logging.NullHandler())
+        return getattr(self._logger, attr)
+
+
+logger = LazyLogger(__name__)
+
+
+def _decode(data):
+    return codecs.decode(data, CONFIG_FILE_ENCODING)
+
+
+def _read_file(path):
+    """Return the decoded content of a file, or None if it can't be read."""
+    try:
+        # the builtin open is faster than io.open on python 2
+        with open(path, 'rb') as fp:
+            data = fp.read()
+    except IOError:
+        return None
+    return _decode(data)
+
+
+def read_source(source):
+    """Return the decoded content of a config source.
+
+    *source* is a file object, opened in binary or text mode, a file
+    descriptor, or the content itself as bytes, bytearray or memoryview.
+    File descriptors are read until the end of file and left open.
+
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _decode(source)
+    if isinstance(source, int):
+        with io.open(source, 'rb', closefd=False) as fp:
+            return _decode(fp.read())
+    data = source.read()
+    if isinstance(data, text_type):
+        return data
+    return _decode(data)
+
+
+# directory -> (modification time, sorted names of its entries)
+_dir_cache = {}
+
+
+def scan_dir(path):
+    """Return the sorted names of the entries of a directory.
+
+    Return None if path is not a directory. The names are cached until the
+    modification time of the directory changes, so scanning an unchanged
+    directory again takes a single stat call.
+
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+    cached = _dir_cache.get(path)
+    if cached is not None and cached[0] == st.st_mtime:
+        return cached[1]
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        return None
+    _dir_cache[path] = (st.st_mtime, names)
+    return names
+
+
+def _is_pattern(filename):
+    return '*' in filename or '?' in filename or '[' in filename
+
+
+def read_files(paths, workers):
+    """Read files concurrently, using up to *workers* threads.
+
+    Return the decoded content of each file, in the same order as *paths*;
+    the content of a file that can't be read is None.
+
+    """
+    # import here as threads are only needed for concurrent reads
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(min(workers, len(paths)))
+    try:
+        return pool.map(_read_file, paths)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _pickle():
+    # import here to keep importing configglue fast
+    if PY2:
+        import cPickle as pickle
+    else:
+        import pickle
+    return pickle
+
+
+def dumps(parser):
+    """Return a SchemaConfigParser serialized as bytes.
+
+    The raw values, locations and pending changes of the parser are kept;
+    its schema is stored by reference when its class can be imported by
+    name, and instantiated again by loads.
+
+    """
+    pickle = _pickle()
+    return pickle.dumps(parser, pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data):
+    """Return the SchemaConfigParser serialized by dumps."""
+    return _pickle().loads(data)
+
+
+# schema class reference -> schema instance shared by restored parsers
+_restored_schemas = {}
+
+
+def _restore_parser(cls, schema, state):
+    """Return a parser of class cls with the given schema and state.
 
+    *schema* is a schema instance, or a reference to its class. Parsers
+    restored with the same reference share a single schema instance.
 
-logger = logging.getLogger(__name__)
-logger.addHandler(NullHandler())
+    """
+    if isinstance(schema, string_types):
+        reference = schema
+        schema = _restored_schemas.get(reference)
+        if schema is None:
+            # import here to avoid circular imports
+            from .schema import load_schema
+
+            schema = load_schema(reference)()
+            _restored_schemas[reference] = schema
+    parser = cls(schema)
+    parser.__setstate__(state)
+    return parser
 
 
 class SchemaValidationError(Exception):
@@ -64,6 +240,9 @@ class SchemaConfigParser(BaseConfigParser, object):
     profit!
 
     """
+    # when set, check that written configs read back to the same values
+    debug = False
+
     def __init__(self, schema):
         super(SchemaConfigParser, self).__init__()
         # validate schema
@@ -72,99 +251,183 @@ class SchemaConfigParser(BaseConfigParser, object):
             raise SchemaValidationError()
         self.schema = schema
         self._location = {}
+        # (section, option) -> (file, line number) the option was read from
+        self._positions = {}
+        # normalized path -> content of the files read from bundles
+        self._sources = {}
+        # names of the schema options, shared with the parsers of includes
+        self._option_names = None
+        # section name -> (required, known option names), see is_valid
+        self._schema_index = None
         self.extra_sections = set()
         self._basedir = ''
         self._dirty = collections.defaultdict(
             lambda: collections.defaultdict(dict))
 
+    def __reduce__(self):
+        # import here to avoid circular imports
+        from .schema import schema_reference
+
+        schema = schema_reference(self.schema) or self.schema
+        return (_restore_parser, (self.__class__, schema,
+                                  self.__getstate__()))
+
+    def __getstate__(self):
+        return {
+            'version': PARSER_STATE_VERSION,
+            'sections': [(name, list(options.items()))
+                         for name, options in self._sections.items()],
+            'defaults': list(self._defaults.items()),
+            'extra_sections': self.extra_sections,
+            'location': self._location,
+            'positions': self._positions,
+            'basedir': self._basedir,
+            'last_location': getattr(self, '_last_location', None),
+            'dirty': dict((filename, dict(sections))
+                          for filename, sections in self._dirty.items()),
+        }
+
+    def __setstate__(self, state):
+        if state.get('version') != PARSER_STATE_VERSION:
+            raise ValueError("Unsupported parser state version: %r" %
+                             state.get('version'))
+        for name, options in state['sections']:
+            self._sections[name] = self._dict(options)
+            if not PY2:
+                self._proxies[name] = configparser.SectionProxy(self, name)
+        self._defaults.update(state['defaults'])
+        self.extra_sections = state['extra_sections']
+        self._location = state['location']
+        self._positions = state['positions']
+        self._basedir = state['basedir']
+        if state['last_location'] is not None:
+            self._last_location = state['last_location']
+        for filename, sections in state['dirty'].items():
+            self._dirty[filename].update(sections)
+
     def is_valid(self, report=False):
         """Return if the state of the parser is valid.
 
         This is useful to detect errors in configuration files, like type
         errors or missing required options.
 
+        Every section and option is checked, so all the errors are found in
+        one go; errors about options read from a file tell its name and the
+        line of the option.
+
         """
-        valid = True
         errors = []
         try:
-            # validate structure
-            config_sections = set(self.sections())
-            schema_sections = set(s.name for s in self.schema.sections())
-            skip_sections = self.extra_sections
-            magic_sections = set(['__main__', '__noschema__'])
-            # test1: no undefined implicit sections
-            unmatched_sections = (skip_sections - config_sections)
-            if unmatched_sections:
-                error_msg = "Undefined sections in configuration: %s"
-                error_value = ', '.join(unmatched_sections)
-                errors.append(error_msg % error_value)
-                valid = False
-            # remove sections to skip from config sections
-            config_sections.difference_update(skip_sections)
-            # test2: no extra sections that are not implicit sections
-            unmatched_sections = (
-                config_sections - magic_sections - schema_sections)
-            if unmatched_sections:
-                error_msg = "Sections in configuration are missing from schema: %s"
-                error_value = ', '.join(unmatched_sections)
-                errors.append(error_msg % error_value)
-                valid = False
-
-            for name in config_sections.union(schema_sections):
-                if name not in skip_sections:
-                    if not self.schema.has_section(name):
-                        # this should have been reported before
-                        # so skip bogus section
-                        continue
-
-                    section = self.schema.section(name)
-                    try:
-                        parsed_options = set(self.options(name))
-                    except NoSectionError:
-                        parsed_options = set([])
-                    schema_options = set(section.options())
-
-                    fatal_options = set(opt.name for opt in schema_options
-                                        if opt.fatal)
-                    # all fatal options are included
-                    fatal_included = parsed_options.issuperset(fatal_options)
-                    if not fatal_included:
-                        error_msg = ("Configuration missing required options"
-                                     " for section '%s': %s")
-                        error_value = ', '.join(list(fatal_options -
-                                                     parsed_options))
-                        errors.append(error_msg % (name, error_value))
-                    valid &= fatal_included
-
-                    # remaining parsed options are valid schema options
-                    other_options = parsed_options - fatal_options
-                    schema_opt_names = set(opt.name for opt in schema_options)
-
-                    # add the default section special includes option
-                    if name == '__main__':
-                        schema_opt_names.add('includes')
-
-                    schema_options = other_options.issubset(schema_opt_names)
-                    if not schema_options:
-                        error_msg = ("Configuration includes invalid options"
-                                     " for section '%s': %s")
-                        error_value = ', '.join(list(other_options -
-                                                     schema_opt_names))
-                        errors.append(error_msg % (name, error_value))
-                    valid &= schema_options
-
-            # structure validates, validate content
-            self.parse_all()
-
+            # parse values first, as dict options add extra sections
+            value_errors = []
+            self.parse_all(errors=value_errors)
+            errors.extend(self._structure_errors())
+            for section, option, error in value_errors:
+                if (isinstance(error, (NoSectionError, NoOptionError)) and
+                        self._is_missing_required(section, option)):
+                    # reported as a missing required option
+                    continue
+                errors.append(text_type(error) +
+                              self._position(section, option))
         except Exception as e:
             errors.append(text_type(e))
-            valid = False
 
+        valid = not errors
         if report:
             return valid, errors
         else:
             return valid
 
+    def _get_schema_index(self):
+        """Return the options of each schema section, by section name.
+
+        Each section is mapped to the set of the names of its required
+        options and to the set of the names of all its options.
+
+        """
+        if self._schema_index is None:
+            index = {}
+            for section in self.schema.sections():
+                options = section.options()
+                known = set(option.name for option in options)
+                if section.name == '__main__':
+                    # the default section special includes option
+                    known.add('includes')
+                required = set(option.name for option in options
+                               if option.fatal)
+                index[section.name] = (required, known)
+            self._schema_index = index
+        return self._schema_index
+
+    def _is_missing_required(self, section, option):
+        """Return if a required option is missing from the config.
+
+        Such options are reported by _structure_errors.
+
+        """
+        required, known = self._get_schema_index().get(section, ((), ()))
+        return (option in required and option not in self._defaults and
+                option not in self._sections.get(section, ()))
+
+    def _position(self, section, option):
+        """Return where an option was read from, as ' (file, line n)'.
+
+        Return an empty string if the file is not known.
+
+        """
+        name = self.optionxform(option)
+        default_section = getattr(self, 'default_section', DEFAULTSECT)
+        position = (self._positions.get((section, name)) or
+                    self._positions.get((default_section, name)))
+        if position is None or position[0] is None:
+            return ''
+        return ' (%s, line %d)' % position
+
+    def _structure_errors(self):
+        """Return the errors in the sections and options of the config."""
+        errors = []
+        index = self._get_schema_index()
+        config_sections = set(self._sections)
+        skip_sections = self.extra_sections
+        magic_sections = set(['__main__', '__noschema__'])
+        # test1: no undefined implicit sections
+        unmatched_sections = skip_sections - config_sections
+        if unmatched_sections:
+            errors.append("Undefined sections in configuration: %s" %
+                          ', '.join(unmatched_sections))
+        # remove sections to skip from config sections
+        config_sections.difference_update(skip_sections)
+        # test2: no extra sections that are not implicit sections
+        unmatched_sections = config_sections - magic_sections - set(index)
+        if unmatched_sections:
+            errors.append(
+                "Sections in configuration are missing from schema: %s" %
+                ', '.join(unmatched_sections))
+
+        default_options = set(self._defaults)
+        for name in config_sections.union(index):
+            if name in skip_sections or name not in index:
+                # sections missing from the schema were reported before
+                continue
+            required, known = index[name]
+            parsed = default_options.union(self._sections.get(name, ()))
+            parsed.discard('__name__')
+
+            # all required options are included
+            missing = required - parsed
+            if missing:
+                errors.append("Configuration missing required options for "
+                              "section '%s': %s" % (name, ', '.join(missing)))
+            # remaining parsed options are valid schema options
+            invalid = parsed - known
+            if invalid:
+                errors.append(
+                    "Configuration includes invalid options for section "
+                    "'%s': %s" % (name, ', '.join(
+                        option + self._position(name, option)
+                        for option in invalid)))
+        return errors
+
     def items(self, section, raw=False, vars=None):
         """Return the list of all options in a section.
 
@@ -240,30 +503,63 @@ class SchemaConfigParser(BaseConfigParser, object):
         else:
             return values
 
-    def read(self, filenames, already_read=None):
-        """Like ConfigParser.read, but consider files we've already read."""
+    def read(self, filenames, already_read=None, workers=None):
+        """Like ConfigParser.read, but consider files we've already read.
+
+        If *workers* is greater than 1, the files are read concurrently by
+        up to that many threads; they are still parsed one at a time, in
+        the given order.
+
+        Directories are read as the '*.cfg' files in them, in name order.
+
+        """
         if already_read is None:
             already_read = set()
         if isinstance(filenames, string_types):
             filenames = [filenames]
+        paths = [os.path.join(self._basedir, filename)
+                 for filename in filenames]
+        pending = [path for path in paths if path not in already_read and
+                   os.path.normpath(path) not in self._sources]
+        if workers is not None and workers > 1 and len(pending) > 1:
+            contents = dict(zip(pending, read_files(pending, workers)))
+
+            def read_file(path):
+                if path in contents:
+                    return contents[path]
+                return self._read_path(path)
+        else:
+            read_file = self._read_path
+
         read_ok = []
-        for filename in filenames:
-            path = os.path.join(self._basedir, filename)
+        for filename, path in zip(filenames, paths):
             if path in already_read:
                 continue
-            try:
-                fp = codecs.open(path, 'r', encoding=CONFIG_FILE_ENCODING)
-            except IOError:
+            content = read_file(path)
+            if content is None:
+                names = self._list_dir(path)
+                if names is not None:
+                    # read the config files in the directory
+                    names = fnmatch.filter(names, INCLUDE_DIR_PATTERN)
+                    read_ok.extend(self.read(
+                        [os.path.join(filename, name) for name in names],
+                        already_read=already_read))
+                    continue
                 logger.warn(
                     'File {0} could not be read. Skipping.'.format(path))
                 continue
+            fpname = path
+            if content.startswith(BUNDLE_MAGIC):
+                # import here to keep importing configglue fast
+                from .bundle import load_bundle
+
+                fpname, sources = load_bundle(content, path)
+                self._sources.update(sources)
+                content = sources[os.path.normpath(fpname)]
             # parse file
-            sub_parser = self.__class__(self.schema)
-            sub_parser._basedir = self._basedir
-            sub_parser._location = self._location
-            sub_parser._read(fp, path, already_read=already_read)
+            sections = self._read_sections(content, fpname, already_read)
             # update current parser with those values
-            for section, options in sub_parser._sections.items():
+            for section, options in sections.items():
                 if section == '__main__':
                     # skip copying includes to avoid including same files twice
                     options.pop('includes', None)
@@ -272,20 +568,84 @@ class SchemaConfigParser(BaseConfigParser, object):
                 else:
                     self._sections[section] = options
 
-            fp.close()
             read_ok.append(path)
             self._last_location = filename
         return read_ok
 
+    def _read_sections(self, content, fpname, already_read):
+        """Return the sections read from a file and the files it includes.
+
+        The positions and locations of their options are recorded in the
+        parser.
+
+        """
+        sub_parser = self.__class__(self.schema)
+        sub_parser._basedir = self._basedir
+        sub_parser._location = self._location
+        sub_parser._option_names = self._get_option_names()
+        sub_parser._positions = self._positions
+        sub_parser._sources = self._sources
+        sub_parser._read_text(content, fpname, already_read=already_read)
+        return sub_parser._sections
+
+    def _read_path(self, path):
+        """Return the decoded content of a file, or None if it can't be read.
+
+        Files found in the bundles read so far are not read from disk.
+
+        """
+        content = self._sources.get(os.path.normpath(path))
+        if content is None:
+            content = _read_file(path)
+        return content
+
+    def _list_dir(self, path):
+        """Return the sorted names of the files in a directory.
+
+        Return None if path is not a directory. Directories missing from
+        disk are looked up in the bundles read so far.
+
+        """
+        names = scan_dir(path)
+        if names is None and self._sources:
+            directory = os.path.normpath(path)
+            names = [os.path.basename(source) for source in self._sources
+                     if os.path.dirname(source) == directory]
+            names = sorted(names) if names else None
+        return names
+
+    def _expand_includes(self, filenames):
+        """Return the list of included files, with glob patterns expanded.
+
+        A pattern matches the names of the files in a single directory,
+        relative to the including file; its matches are sorted by name.
+
+        """
+        expanded = []
+        for filename in filenames:
+            if not _is_pattern(filename):
+                expanded.append(filename)
+                continue
+            directory, pattern = os.path.split(filename)
+            names = self._list_dir(os.path.join(self._basedir, directory))
+            expanded.extend(os.path.join(directory, name)
+                            for name in fnmatch.filter(names or [], pattern))
+        return expanded
+
     def readfp(self, fp, filename=None):
-        """Like ConfigParser.readfp, but consider the encoding."""
-        # wrap the StringIO so it can read encoded text
-        decoded_fp = codecs.getreader(CONFIG_FILE_ENCODING)(fp)
-        self._read(decoded_fp, filename)
+        """Like ConfigParser.readfp, but consider the encoding.
+
+        *fp* can also be a file descriptor, or the content of a config file
+        as bytes, bytearray or memoryview; see read_source.
+
+        """
+        self._read_text(read_source(fp), filename)
 
     def _read(self, fp, fpname, already_read=None):
-        # read file content
-        self._update(fp, fpname)
+        self._read_text(read_source(fp), fpname, already_read=already_read)
+
+    def _read_text(self, text, fpname, already_read=None):
+        self._update(text, fpname)
 
         if already_read is None:
             already_read = set()
@@ -295,12 +655,16 @@ class SchemaConfigParser(BaseConfigParser, object):
             old_basedir, self._basedir = self._basedir, os.path.dirname(
                 fpname)
             includes = self.get('__main__', 'includes')
-            filenames = [text_type.strip(x) for x in includes]
+            filenames = self._expand_includes(
+                [text_type.strip(x) for x in includes])
 
             # parse included files
             sub_parser = self.__class__(self.schema)
             sub_parser._basedir = self._basedir
             sub_parser._location = self._location
+            sub_parser._option_names = self._get_option_names()
+            sub_parser._positions = self._positions
+            sub_parser._sources = self._sources
             sub_parser.read(filenames)
             # update current parser with those values
             for section, options in sub_parser._sections.items():
@@ -317,16 +681,34 @@ class SchemaConfigParser(BaseConfigParser, object):
             if filenames:
                 # re-read the file to override included options with
                 # local values
-                fp.seek(0)
-                self._update(fp, fpname)
+                self._update(text, fpname)
+
+    def _update(self, text, fpname):
+        if not supports(self):
+            # remember current values
+            old_sections = copy.deepcopy(self._sections)
+            # read in new file
+            super(SchemaConfigParser, self)._read(io.StringIO(text), fpname)
+            # update location of changed values
+            self._update_location(old_sections, fpname)
+            return
+
+        assigned = apply_tokens(self, tokenize(text, self), fpname)
+        option_names = self._get_option_names()
+        default_section = getattr(self, 'default_section', DEFAULTSECT)
+        for (section, option), (lineno, old_value) in assigned.items():
+            self._positions[section, option] = (fpname, lineno)
+            if section == default_section or option not in option_names:
+                continue
+            if old_value is MISSING or (
+                    old_value != self._sections[section][option]):
+                self._location[option] = fpname
 
-    def _update(self, fp, fpname):
-        # remember current values
-        old_sections = copy.deepcopy(self._sections)
-        # read in new file
-        super(SchemaConfigParser, self)._read(fp, fpname)
-        # update location of changed values
-        self._update_location(old_sections, fpname)
+    def _get_option_names(self):
+        if self._option_names is None:
+            self._option_names = set(
+                option.name for option in self.schema.options())
+        return self._option_names
 
     def _update_location(self, old_sections, filename):
         # keep list of valid options to include locations for
@@ -385,7 +767,7 @@ class SchemaConfigParser(BaseConfigParser, object):
                      section, e))
         return value
 
-    def parse_all(self):
+    def parse_all(self, errors=None):
         """Go through all sections and options attempting to parse each one.
 
         If any options are omitted from the config file, provide the
@@ -394,14 +776,62 @@ class SchemaConfigParser(BaseConfigParser, object):
         In the case of an NoSectionError or NoOptionError, raise it if the
         option has *fatal* set to *True*.
 
+        If *errors* is a list, errors are appended to it as (section name,
+        option name, exception) tuples instead of raised, and every option
+        is parsed.
+
         """
         for section in self.schema.sections():
-            for option in section.options():
+            for option in self._parse_scalars(section, errors):
                 try:
                     self.get(section.name, option.name, raw=option.raw)
-                except (NoSectionError, NoOptionError):
+                except (NoSectionError, NoOptionError) as e:
                     if option.fatal:
+                        if errors is None:
+                            raise
+                        errors.append((section.name, option.name, e))
+                except Exception as e:
+                    if errors is None:
                         raise
+                    errors.append((section.name, option.name, e))
+
+    def _parse_scalars(self, section, errors=None):
+        """Parse the plain scalar values of a section in batches.
+
+        Values that need no interpolation and belong to an option type found
+        in BATCH_PARSERS are parsed together, one call per option type.
+        Errors are appended to *errors*, if it's a list, instead of raised.
+
+        Return the list of options that still need to be looked up one by
+        one.
+
+        """
+        raw_options = self._sections.get(section.name, {})
+        batches = collections.defaultdict(list)
+        pending = []
+        for option in section.options():
+            parse_many = BATCH_PARSERS.get(type(option))
+            value = raw_options.get(self.optionxform(option.name))
+            if (parse_many is None or option.raw or
+                    not isinstance(value, string_types) or
+                    '%' in value or '$' in value):
+                pending.append(option)
+            else:
+                batches[parse_many].append((option, value))
+
+        for parse_many, items in batches.items():
+            try:
+                parse_many([value for option, value in items])
+            except ValueError:
+                # parse one by one to report the offending options
+                for option, value in items:
+                    try:
+                        self.parse(section.name, option.name, value)
+                    except ValueError as e:
+                        if errors is None:
+                            raise
+                        errors.append((section.name, option.name, e))
+        return pending
 
     def locate(self, option=None):
         """Return the location (file) where the option was last defined."""
@@ -444,18 +874,17 @@ class SchemaConfigParser(BaseConfigParser, object):
         # iterate over the other sections
         for key in keys:
             # we want the unparsed value
-            try:
-                value = self.get(section, key, parse=False)
-            except (NoSectionError, NoOptionError):
+            value = self._lookup(section, key, parse=False)
+            if value is _NOT_FOUND:
                 # value of key not found in config, so try in special
                 # sections
                 for section in ('__main__', '__noschema__'):
                     try:
-                        value = super(SchemaConfigParser, self).get(section,
-                                                                    key)
-                        break
-                    except:
+                        value = self._lookup_config(section, key)
+                    except InterpolationMissingOptionError:
                         continue
+                    if value is not _NOT_FOUND:
+                        break
                 else:
                     return
             values[key] = value
@@ -466,6 +895,21 @@ class SchemaConfigParser(BaseConfigParser, object):
         assert isinstance(result, string_types)
         return result
 
+    def _interpolate_environment(self, rawval, raw=False):
+        """Interpolate environment variables, like interpolate_environment.
+
+        Return _NOT_FOUND instead of raising KeyError for variables that
+        are not defined.
+
+        """
+        if raw or ('$' not in rawval and '%' not in rawval):
+            # nothing to interpolate
+            return rawval
+        try:
+            return self.interpolate_environment(rawval)
+        except KeyError:
+            return _NOT_FOUND
+
     def interpolate_environment(self, rawval, raw=False):
         """Interpolate environment variables"""
         if raw:
@@ -522,7 +966,8 @@ class SchemaConfigParser(BaseConfigParser, object):
         # no default value found, raise an error
         raise NoOptionError(option, section)
 
-    def get(self, section, option, raw=False, vars=None, parse=True):
+    def get(self, section, option, raw=False, vars=None, parse=True,
+            fallback=_UNSET):
         """Return the parsed value of an option.
 
         If *raw* is True, return the value as it's stored in the parser,
@@ -532,39 +977,115 @@ class SchemaConfigParser(BaseConfigParser, object):
 
         If *parse* is False, return the string representation of the value.
 
+        *fallback* follows the python 3 configparser API, whose interpolation
+        uses it to fetch raw values: when given, the value is looked up like
+        ConfigParser.get does, and fallback is returned for missing options.
+
         """
-        try:
-            # get option's raw mode setting
+        if fallback is not _UNSET:
+            return super(SchemaConfigParser, self).get(
+                section, option, raw=raw, vars=vars, fallback=fallback)
+
+        value = self._lookup(section, option, raw=raw, vars=vars, parse=parse)
+        if value is _NOT_FOUND:
+            # no value and no default, raise the appropriate error
+            value = self._get_default(section, option)
+        return value
+
+    def _lookup(self, section, option, raw=False, vars=None, parse=True):
+        """Return the value of an option, like get.
+
+        Options missing from the config fall back to their schema default;
+        _NOT_FOUND is returned instead of raising when there is none.
+
+        """
+        option_obj = self._find_option(section, option)
+        if option_obj is not None and option_obj.raw:
+            raw = True
+        value = self._lookup_config(section, option, raw, vars)
+        if value is _NOT_FOUND:
+            # option not found in config, use its default value from schema
+            value = self._lookup_default(section, option_obj)
+            if value is _NOT_FOUND:
+                return value
+
+        # interpolate environment variables
+        if isinstance(value, string_types):
+            interpolated = self._interpolate_environment(value, raw)
+            if interpolated is _NOT_FOUND:
+                # interpolation failed, fallback to default value
+                return self._lookup_default(section, option_obj)
+            value = interpolated
+            if parse:
+                try:
+                    value = self.parse(section, option, value)
+                except KeyError:
+                    return self._lookup_default(section, option_obj)
+        return value
+
+    def _find_option(self, section, option):
+        """Return the schema Option for an option, or None."""
+        section_obj = self.schema._sections.get(section)
+        option_obj = getattr(section_obj, option, None)
+        if isinstance(option_obj, Option):
+            return option_obj
+
+    def _lookup_default(self, section, option_obj):
+        """Return the default value of an option, or _NOT_FOUND."""
+        if option_obj is None or option_obj.fatal:
+            return _NOT_FOUND
+        return option_obj.default
+
+    def _lookup_config(self, section, option, raw=False, vars=None):
+        """Return the value of an option as read from the config files.
+
+        Values are interpolated unless *raw* is True; references to options
+        in other sections are resolved by _interpolate_value. _NOT_FOUND is
+        returned for options not in the config.
+
+        """
+        if vars:
+            # uncommon; let ConfigParser handle the extra values
             try:
-                option_obj = self._get_option(section, option)
-                raw = option_obj.raw or raw
-            except:
-                pass
+                return self._get_config(section, option, raw, vars)
+            except (NoSectionError, NoOptionError):
+                return _NOT_FOUND
+
+        options = self._sections.get(section)
+        if options is None and section != DEFAULTSECT:
+            return _NOT_FOUND
+        name = self.optionxform(option)
+        value = _NOT_FOUND
+        if options is not None:
+            value = options.get(name, _NOT_FOUND)
+        if value is _NOT_FOUND:
+            value = self._defaults.get(name, _NOT_FOUND)
+        if raw or not isinstance(value, string_types) or '%' not in value:
+            return value
+
+        keys = self._extract_interpolation_keys(value)
+        if all(self.optionxform(key) in (options or ()) or
+               self.optionxform(key) in self._defaults for key in keys):
             # value is defined entirely in current section
-            value = super(SchemaConfigParser, self).get(section, option,
-                                                        raw=raw, vars=vars)
+            return self._get_config(section, option, raw, vars)
+        # interpolation key not in same section
+        interpolated = self._interpolate_value(section, option)
+        if interpolated is None:
+            # this should be a string, so None indicates an error
+            return self._get_config(section, option, raw, vars)
+        return interpolated
+
+    def _get_config(self, section, option, raw, vars):
+        try:
+            return super(SchemaConfigParser, self).get(
+                section, option, raw=raw, vars=vars)
         except InterpolationMissingOptionError as e:
             # interpolation key not in same section
             value = self._interpolate_value(section, option)
             if value is None:
                 # this should be a string, so None indicates an error
                 raise e
-        except (NoSectionError, NoOptionError) as e:
-            # option not found in config, try to get its default value from
-            # schema
-            value = self._get_default(section, option)
-
-        # interpolate environment variables
-        if isinstance(value, string_types):
-            try:
-                value = self.interpolate_environment(value, raw=raw)
-                if parse:
-                    value = self.parse(section, option, value)
-            except KeyError:
-                # interpolation failed, fallback to default value
-                value = self._get_default(section, option)
-
-        return value
+            return value
 
     def _get_option(self, section, option):
         section_obj = self.schema.section(section)
@@ -590,37 +1111,95 @@ class SchemaConfigParser(BaseConfigParser, object):
         self._dirty[filename][section][option] = str_value
 
     def write(self, fp):
-        """Write an .ini-format representation of the configuration state."""
-        # make sure the parser is populated
-        self._fill_parser()
+        """Write an .ini-format representation of the configuration state.
+
+        Every option in the schema is written with its current value, along
+        with any other option read from the config files. The output is
+        generated and written one section at a time.
 
+        """
+        chunks = []
+        for chunk in self._format_sections():
+            fp.write(chunk)
+            if self.debug:
+                chunks.append(chunk)
+        if self.debug:
+            self._check_round_trip(''.join(chunks))
+
+    def _format_sections(self):
+        """Yield the .ini-format representation of each section."""
         if self._defaults:
-            fp.write("[%s]\n" % DEFAULTSECT)
+            lines = ["[%s]\n" % DEFAULTSECT]
             for (key, value) in self._defaults.items():
-                fp.write("%s = %s\n" % (key, value.replace('\n', '\n\t')))
-            fp.write("\n")
-        for section in self._sections:
-            fp.write("[%s]\n" % section)
-            for (key, value) in self._sections[section].items():
-                if key == "__name__":
-                    continue
+                lines.append("%s = %s\n" % (key, value.replace('\n', '\n\t')))
+            lines.append("\n")
+            yield ''.join(lines)
+
+        schema_sections = collections.OrderedDict(
+            (section.name, section) for section in self.schema.sections())
+        names = list(self._sections)
+        names.extend(name for name, section in schema_sections.items()
+                     if name not in self._sections and section.options())
+        for name in names:
+            raw_options = self._sections.get(name, {})
+            section = schema_sections.get(name)
+            options = collections.OrderedDict()
+            if section is not None:
+                for option in section.options():
+                    options[self.optionxform(option.name)] = option
+            keys = [key for key in raw_options if key != '__name__']
+            keys.extend(key for key in options if key not in raw_options)
+
+            lines = ["[%s]\n" % name]
+            for key in keys:
+                option = options.get(key)
+                if option is None:
+                    value = raw_options[key]
+                else:
+                    value = self._format_value(name, option)
                 if (value is not None) or (self._optcre == self.OPTCRE):
                     key = " = ".join((key, value.replace('\n', '\n\t')))
-                fp.write("%s\n" % (key))
-            fp.write("\n")
+                lines.append("%s\n" % (key))
+            lines.append("\n")
+            yield ''.join(lines)
+
+    def _format_value(self, section, option):
+        """Return the string to write for an option's current value."""
+        value = self.get(section, option.name)
+        if not option.validate(value):
+            raise TypeError("{0} is not a valid {1} value.".format(
+                value, type(option).__name__))
+        return option.to_string(value)
+
+    def _check_round_trip(self, text):
+        """Make sure reading back the written text gives the same values."""
+        parser = self.__class__(self.schema)
+        # the text holds the values of the included files already, so
+        # don't follow the includes again
+        parser._update(text, None)
+        assert parser.values() == self.values()
 
     def save(self, fp=None):
         """Save the parser contents to a file.
 
         The data will be saved as a ini file.
 
+        If no file is given, the options set since the last save are
+        written back to the files they were read from. Only their lines
+        change; all the files are updated together, and left untouched if
+        any of them can't be written.
+
         """
         if fp is not None:
             if isinstance(fp, string_types):
-                fp = codecs.open(fp, 'w', encoding=CONFIG_FILE_ENCODING)
-            self.write(fp)
+                with io.open(fp, 'w', encoding=CONFIG_FILE_ENCODING) as f:
+                    self.write(f)
+            else:
+                self.write(fp)
         else:
-            # write to the original files
+            # write to the original files, only changing the lines of the
+            # options that were set
+            changes = collections.OrderedDict()
             for filename, sections in self._dirty.items():
 
                 if filename is None:
@@ -635,27 +1214,14 @@ class SchemaConfigParser(BaseConfigParser, object):
                     else:
                         filename = self._last_location
 
-                parser = BaseConfigParser()
-                parser.read(filename)
-
+                file_changes = changes.setdefault(filename, {})
                 for section, options in sections.items():
-                    for option, value in options.items():
-                        parser.set(section, option, value)
-
-                # write to new file
-                parser.write(codecs.open("%s.new" % filename, 'w',
-                                         encoding=CONFIG_FILE_ENCODING))
-                # rename old file
-                if os.path.exists(filename):
-                    os.rename(filename, "%s.old" % filename)
-                # rename new file
-                os.rename("%s.new" % filename, filename)
-
-    def _fill_parser(self):
-        """Populate parser with current values for each option."""
-        values = self.values()
-        for section, options in values.items():
-            for option, value in options.items():
-                self.set(section, option, value)
-        # make sure having set the options didn't change anything
-        assert values == self.values()
+                    file_changes.setdefault(section, {}).update(options)
+
+            contents = []
+            for filename, sections in changes.items():
+                lines = update_lines(read_lines(filename), sections,
+                                     self.optionxform)
+                contents.append((filename, ''.join(lines)))
+            save_files(contents)
+            self._dirty.clear()
@@ -15,12 +15,12 @@
 ###############################################################################
 from __future__ import unicode_literals
 
-import json
+import sys
 from copy import deepcopy
-from inspect import getmembers
 
 from ._compat import text_type, string_types
 from ._compat import NoSectionError, NoOptionError
+from ._scalars import parse_bool
 
 
 
@@ -34,16 +34,33 @@ __all__ = [
     'Schema',
     'StringOption',
     'TupleOption',
+    'load_schema',
     'merge',
+    'schema_reference',
 ]
 
 NO_DEFAULT = object()
 
 
+def _members(obj):
+    """Return the (name, value) attributes of obj, sorted by name.
+
+    Like inspect.getmembers, without importing inspect.
+
+    """
+    members = []
+    for name in sorted(dir(obj)):
+        try:
+            members.append((name, getattr(obj, name)))
+        except AttributeError:
+            continue
+    return members
+
+
 def get_config_objects(obj):
     """Return the list of Section- and Option-derived objects."""
     objects = []
-    for name, obj in getmembers(obj):
+    for name, obj in _members(obj):
         if isinstance(obj, (Section, Option)):
             objects.append((name, obj))
         elif type(obj) == type and issubclass(obj, Section):
@@ -97,6 +114,29 @@ def merge(*schemas):
     return MergedSchema
 
 
+def load_schema(reference):
+    """Import and return the schema class a 'module:ClassName' refers to."""
+    # import here to keep importing configglue fast
+    from importlib import import_module
+
+    module_name, _, class_name = reference.partition(':')
+    return getattr(import_module(module_name), class_name)
+
+
+def schema_reference(schema):
+    """Return the 'module:ClassName' reference to the class of a schema.
+
+    Return None if the class can't be imported by name, like classes
+    defined in a function or made by merge.
+
+    """
+    cls = type(schema)
+    module = sys.modules.get(cls.__module__)
+    if getattr(module, cls.__name__, None) is not cls:
+        return None
+    return '{0}:{1}'.format(cls.__module__, cls.__name__)
+
+
 class Schema(object):
     """A complete description of a system configuration.
 
@@ -112,7 +152,9 @@ class Schema(object):
 
     One Option comes already defined in Schema, 'includes' in the
     '__main__' section, that allows configuration files to include other
-    configuration files.
+    configuration files. Included names can be directories, whose '*.cfg'
+    files are included, or glob patterns matching file names in a single
+    directory; both are expanded in name order.
 
     """
 
@@ -376,12 +418,7 @@ class BoolOption(Option):
         if raw:
             return value
 
-        if value.lower() in ['y', '1', 'yes', 'on', 'true']:
-            return True
-        elif value.lower() in ['n', '0', 'no', 'off', 'false']:
-            return False
-        else:
-            raise ValueError("Unable to determine boolosity of %r" % value)
+        return parse_bool(value)
 
     def validate(self, value):
         return isinstance(value, bool)
@@ -474,6 +511,9 @@ class ListOption(Option):
 
         is_json = self.parse_json
         if is_json:
+            # import here to keep importing configglue fast
+            import json
+
             try:
                 parsed = json.loads(value)
                 is_json = isinstance(parsed, list)
@@ -496,6 +536,9 @@ class ListOption(Option):
 
     def to_string(self, value):
         if self.parse_json:
+            # import here to keep importing configglue fast
+            import json
+
             return json.dumps(value)
         else:
             return super(ListOption, self).to_string(value)
@@ -670,6 +713,9 @@ class DictOption(Option):
         """
         is_json = self.parse_json
         if is_json:
+            # import here to keep importing configglue fast
+            import json
+
             try:
                 parsed = json.loads(value)
                 is_json = isinstance(parsed, dict)
@@ -727,6 +773,9 @@ class DictOption(Option):
 
     def to_string(self, value):
         if self.parse_json:
+            # import here to keep importing configglue fast
+            import json
+
             return json.dumps(value)
         else:
             return super(DictOption, self).to_string(value)
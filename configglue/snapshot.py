@@ -0,0 +1,176 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Read-only snapshots of the parsed values of a SchemaConfigParser.
+
+A snapshot is a file holding the parsed value of every option of a parser.
+Pre-fork servers can write it once in the master process and map it in
+every worker: the values are decoded from the shared pages of the mapping
+on each access, so workers don't keep private copies of them.
+
+A snapshot starts with SNAPSHOT_MAGIC and a line holding the JSON index of
+its options, followed by the JSON encoded values:
+
+    #configglue-snapshot 1
+    {"__main__": {"foo": [0, 2, ""]}, ...}
+    42...
+
+Each option of the index is mapped to the offset and length of its value,
+in bytes following the index line, and to 't' for tuple values, which JSON
+can't tell from lists.
+
+Snapshots are published by renaming a complete file over the previous one,
+so readers either see the old or the new snapshot; Snapshot.refresh maps
+the latest one published.
+
+"""
+import io
+import json
+import mmap
+import os
+
+
+__all__ = [
+    'Snapshot',
+    'dump_snapshot',
+    'write_snapshot',
+]
+
+SNAPSHOT_MAGIC = b'#configglue-snapshot 1\n'
+
+
+def dump_snapshot(parser):
+    """Return a snapshot of the parsed values of parser, as bytes.
+
+    Values are stored as JSON; a TypeError is raised for values that can't
+    be encoded as JSON.
+
+    """
+    index = {}
+    data = []
+    offset = 0
+    for section, options in parser.values().items():
+        section_index = index[section] = {}
+        for option, value in options.items():
+            encoded = json.dumps(value).encode('utf-8')
+            kind = 't' if isinstance(value, tuple) else ''
+            section_index[option] = (offset, len(encoded), kind)
+            data.append(encoded)
+            offset += len(encoded)
+    header = SNAPSHOT_MAGIC + json.dumps(index).encode('utf-8') + b'\n'
+    return header + b''.join(data)
+
+
+def write_snapshot(parser, path):
+    """Publish a snapshot of the parsed values of parser in path."""
+    tmp_path = '{0}.new'.format(path)
+    with io.open(tmp_path, 'wb') as fp:
+        fp.write(dump_snapshot(parser))
+    # publish the snapshot atomically
+    os.rename(tmp_path, path)
+
+
+def _read_index(data, name):
+    """Return the index of a snapshot, and the offset of its values."""
+    index_end = data.find(b'\n', len(SNAPSHOT_MAGIC))
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or index_end < 0:
+        raise ValueError("Not a config snapshot: %s" % name)
+    index = json.loads(data[len(SNAPSHOT_MAGIC):index_end].decode('utf-8'))
+    return index, index_end + 1
+
+
+class Snapshot(object):
+    """A read-only view of the snapshot stored in a file.
+
+    The file is memory mapped; each value is decoded when it's accessed.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._map()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Return a view of a snapshot held in memory."""
+        snapshot = cls.__new__(cls)
+        snapshot.path = None
+        snapshot._data = data
+        snapshot._index, snapshot._data_start = _read_index(data, '<bytes>')
+        return snapshot
+
+    def _map(self):
+        with io.open(self.path, 'rb') as fp:
+            stat = os.fstat(fp.fileno())
+            mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            index, data_start = _read_index(mapping, self.path)
+        except ValueError:
+            mapping.close()
+            raise
+
+        self.close()
+        self._data = mapping
+        self._index = index
+        self._data_start = data_start
+        self._stat = (stat.st_ino, stat.st_mtime, stat.st_size)
+
+    def refresh(self):
+        """Map the latest snapshot published at path.
+
+        Return whether a new snapshot was mapped. Values read from the
+        previous snapshot are unaffected.
+
+        """
+        if self.path is None:
+            return False
+        stat = os.stat(self.path)
+        if (stat.st_ino, stat.st_mtime, stat.st_size) == self._stat:
+            return False
+        self._map()
+        return True
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = None
+
+    def sections(self):
+        return list(self._index)
+
+    def options(self, section):
+        return list(self._index[section])
+
+    def get(self, section, option):
+        """Return the parsed value of an option.
+
+        Raise KeyError if the option is not in the snapshot.
+
+        """
+        offset, length, kind = self._index[section][option]
+        start = self._data_start + offset
+        value = json.loads(self._data[start:start + length].decode('utf-8'))
+        if kind == 't':
+            value = tuple(value)
+        return value
+
+    def values(self, section=None):
+        """Return a dict with the values of a section, or of all sections."""
+        if section is not None:
+            return dict((option, self.get(section, option))
+                        for option in self._index[section])
+        return dict((name, self.values(name)) for name in self._index)
@@ -85,7 +85,7 @@ class ConfigTestCase(TestCase):
         self.assertEqual(config.glue, mock_configglue.return_value)
         mock_configglue.assert_called_with(
             mock_merge.return_value, mock_get_config_files.return_value,
-            op=app.parser)
+            op=app.parser, workers=config.workers)
 
     def test_glue_valid_config(self):
         config = make_config()
@@ -110,9 +110,12 @@ class ConfigTestCase(TestCase):
         config = make_config(app=app)
         self.assertEqual(config.get_config_files(app), [])
 
+    @patch('configglue.app.base.os.listdir')
     @patch('xdg.BaseDirectory.os.path.exists')
-    def test_get_config_files_full_hierarchy(self, mock_path_exists):
+    def test_get_config_files_full_hierarchy(self, mock_path_exists,
+        mock_listdir):
         mock_path_exists.return_value = True
+        mock_listdir.return_value = ['myapp.cfg']
 
         config_files = []
         for path in reversed(self.get_xdg_config_dirs()):
@@ -123,10 +126,33 @@ class ConfigTestCase(TestCase):
         config = make_config(app=app)
         self.assertEqual(config.get_config_files(app=app), config_files)
 
+    @patch('configglue.app.base.os.listdir')
+    @patch('xdg.BaseDirectory.os.path.exists')
+    def test_get_config_files_scans_each_dir_once(self, mock_path_exists,
+        mock_listdir):
+        mock_path_exists.return_value = True
+        xdg_dirs = list(reversed(self.get_xdg_config_dirs()))
+        listings = {os.path.join(xdg_dirs[-1], 'myapp'): ['myapp.cfg']}
+        mock_listdir.side_effect = lambda path: listings.get(path, [])
+
+        app = make_app(name='myapp')
+        for workers in (1, 4):
+            config = make_config(app=app)
+            config.workers = workers
+            mock_listdir.reset_mock()
+            self.assertEqual(config.get_config_files(app=app), [
+                os.path.join(xdg_dirs[-1], 'myapp', 'myapp.cfg'),
+                './local.cfg'])
+            scanned = [args[0] for args, kwargs in mock_listdir.call_args_list]
+            self.assertEqual(sorted(scanned), sorted(
+                os.path.join(path, 'myapp') for path in xdg_dirs))
+
+    @patch('configglue.app.base.os.listdir')
     @patch('xdg.BaseDirectory.os.path.exists')
     def test_get_config_files_with_plugins_full_hierarchy(self,
-        mock_path_exists):
+        mock_path_exists, mock_listdir):
         mock_path_exists.return_value = True
+        mock_listdir.return_value = ['myapp.cfg', 'foo.cfg']
 
         class Foo(Plugin):
             enabled = True
@@ -37,6 +37,10 @@ class Foo(Plugin):
     pass
 
 
+class Bar(Plugin):
+    pass
+
+
 class PluginTestCase(TestCase):
     def test_defaults(self):
         plugin = Plugin()
@@ -90,3 +94,52 @@ class PluginManagerTestCase(TestCase):
 
         plugins.register(Foo)
         self.assertEqual(plugins.available, [Foo])
+
+    def test_register_twice(self):
+        plugins = make_plugins(available=[Foo, Foo])
+        self.assertEqual(plugins.available, [Foo])
+
+    def test_register_same_name(self):
+        other = type(str('Foo'), (Plugin,), {'__module__': 'other.module'})
+        plugins = make_plugins(available=[Foo, __name__ + ':Foo'])
+        self.assertRaises(ValueError, plugins.register, other)
+        self.assertRaises(ValueError, plugins.register, 'other.module:Foo')
+        self.assertEqual(plugins.available, [Foo])
+
+    def test_register_reference(self):
+        plugins = make_plugins(available=['no.such.module:Missing'])
+        # registering a reference does not import the plugin
+        self.assertEqual(plugins.names, ['Missing'])
+        self.assertEqual(plugins.enabled, [])
+        self.assertEqual(plugins.schemas, [])
+        plugins.disable('Missing')
+        self.assertRaises(ImportError, plugins.get, 'Missing')
+
+    def test_available_is_lazy(self):
+        plugins = make_plugins(available=['no.such.module:Missing'])
+        available = plugins.available
+        self.assertEqual(len(available), 1)
+        self.assertFalse(Foo in available)
+        self.assertRaises(ImportError, list, available)
+
+    def test_assign_available(self):
+        plugins = PluginManager()
+        plugins.available = [Foo]
+        self.assertEqual(plugins.names, ['Foo'])
+        self.assertEqual(plugins.get('Foo'), Foo)
+
+        plugins.available.append(__name__ + ':Bar')
+        self.assertEqual(plugins.names, ['Foo', 'Bar'])
+        self.assertEqual(plugins.available, [Foo, Bar])
+        self.assertEqual(plugins.available[1:], [Bar])
+
+    def test_enable_reference(self):
+        plugins = make_plugins(available=[__name__ + ':Foo'])
+        self.addCleanup(setattr, Foo, 'enabled', False)
+
+        plugins.enable('Foo')
+        self.assertEqual(plugins.enabled, [Foo])
+        self.assertEqual(plugins.available, [Foo])
+
+        plugins.disable('Foo')
+        self.assertEqual(plugins.enabled, [])
@@ -59,3 +59,21 @@ class TestAttributed(BaseTest):
     def test_config_after_parsing_still_knows_about_empty_values(self):
         self.config.parse_all()
         self.assertTrue(self.config.get('xyzzy', 'bar').is_empty)
+
+    def test_parse_all_matches_parse(self):
+        expected = AttributedConfigParser()
+        expected.readfp(StringIO(self.config_string))
+        for option in expected.normalized_options('xyzzy'):
+            expected.parse('xyzzy', option)
+        self.config.parse_all()
+        self.assertEqual(
+            sorted((k, v.value, v.attrs)
+                   for k, v in self.config.items('xyzzy')),
+            sorted((k, v.value, v.attrs)
+                   for k, v in expected.items('xyzzy')))
+
+    def test_parse_all_does_not_interpolate(self):
+        self.config.set('xyzzy', 'foo.path', '%(missing)s/bin')
+        self.config.parse_all()
+        self.assertEqual(self.config.get('xyzzy', 'foo').attrs['path'],
+                         '%(missing)s/bin')
@@ -18,14 +18,17 @@ from __future__ import unicode_literals
 # in testfiles, putting docstrings on methods messes up with the
 # runner's output, so pylint: disable-msg=C0111
 
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 from io import BytesIO, StringIO, TextIOWrapper
 
 from mock import patch
 
 from configglue._compat import PY2
-from configglue.inischema.glue import configglue
+from configglue.inischema.glue import configglue, ini2schema
 
 
 class TestBase(unittest.TestCase):
@@ -194,3 +197,68 @@ bar.action = append
     def test_append(self):
         parser, options, args = configglue(self.file, args=['', '--bar=x'])
         self.assertEqual(options.bar, ['a', 'b', 'x'])
+
+
+class TestSchemaCache(TestBase):
+    ini = b'''[__main__]
+foo.parser = int
+foo.help = the foo
+foo = 2
+
+[blah]
+bar.parser = lines
+bar.short_name = b
+bar = a
+      b
+'''
+
+    def setUp(self):
+        super(TestSchemaCache, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def make_file(self, ini=None):
+        return TextIOWrapper(BytesIO(self.ini if ini is None else ini))
+
+    def schema_values(self, parser):
+        return [(section.name, [(option.name, type(option), option.default,
+                                 option.help, option.short_name)
+                                for option in section.options()])
+                for section in parser.schema.sections()]
+
+    def test_cached_schema_matches(self):
+        expected = self.schema_values(ini2schema(self.make_file()))
+        parser = ini2schema(self.make_file(), cache_dir=self.cache_dir)
+        self.assertEqual(self.schema_values(parser), expected)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        with patch('configglue.inischema.glue.AttributedConfigParser') as (
+                mock_parser):
+            parser = ini2schema(self.make_file(), cache_dir=self.cache_dir)
+        # the cached definition is used, without parsing the schema file
+        self.assertFalse(mock_parser.called)
+        self.assertEqual(self.schema_values(parser), expected)
+
+    def test_changed_content_is_compiled(self):
+        ini2schema(self.make_file(), cache_dir=self.cache_dir)
+        parser = ini2schema(self.make_file(b'[__main__]\nbaz = 1\n'),
+                            cache_dir=self.cache_dir)
+        self.assertEqual(
+            [option.name for option in parser.schema.options()], ['baz'])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_broken_cache_is_ignored(self):
+        ini2schema(self.make_file(), cache_dir=self.cache_dir)
+        path = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        with open(path, 'w') as fp:
+            fp.write('not json')
+        parser = ini2schema(self.make_file(), cache_dir=self.cache_dir)
+        self.assertEqual(self.schema_values(parser),
+                         self.schema_values(ini2schema(self.make_file())))
+
+    def test_configglue_cache_dir(self):
+        parser, options, args = configglue(self.file, args=['', '--foo=3'],
+                                           cache_dir=self.cache_dir)
+        self.assertEqual(options.foo, '3')
+        self.assertEqual(options.blah_bar, ['a', 'b'])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
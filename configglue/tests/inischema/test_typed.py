@@ -141,5 +141,94 @@ class TestParserd(BaseTest):
         self.assertEqual(self.config.get('xyzzy', 'baz').value, True)
 
 
+
+class TestBatchParsers(unittest.TestCase):
+    config_string = '''
+[xyzzy]
+a = 1
+a.parser = upper
+b = 2
+b.parser = upper
+c = 3
+c.parser = upper
+c.parser.args = x
+d = on
+d.parser = bool
+e.default = 5
+e.parser = int
+f = 3
+f.parser = int
+'''
+
+    def setUp(self):
+        self.config = TypedConfigParser()
+        self.config.readfp(StringIO(self.config_string))
+        self.calls = []
+
+    def upper(self, values, *args):
+        self.calls.append((list(values), args))
+        return ['%s%s' % (value, ''.join(args)) for value in values]
+
+    def values(self):
+        return dict((k, v.value) for k, v in self.config.items('xyzzy'))
+
+    def test_values_sharing_a_parser_are_batched(self):
+        self.config.add_batch_parser('upper', self.upper)
+        self.config.parse_all()
+        self.assertEqual(self.values(), {'a': '1', 'b': '2', 'c': '3x',
+                                         'd': True, 'e': 5, 'f': 3})
+        self.assertEqual(sorted(self.calls),
+                         [(['1', '2'], ()), (['3'], ('x',))])
+
+    def test_batch_parser_parses_single_values(self):
+        self.config.add_batch_parser('upper', self.upper)
+        self.config.parse('xyzzy', 'c')
+        value = self.config.get('xyzzy', 'c')
+        self.assertEqual(value.value, '3x')
+        self.assertEqual(value.parser('4', 'y'), '4y')
+
+    def test_add_second_batch_parser_fails(self):
+        self.config.add_batch_parser('upper', self.upper)
+        self.assertRaises(ValueError, self.config.add_batch_parser,
+                          'upper', self.upper)
+        self.config.add_batch_parser('upper', self.upper, clobber=True)
+
+    def test_clobbering_parser_drops_batch_parser(self):
+        self.config.add_batch_parser('upper', self.upper)
+        self.config.add_parser('int', float, clobber=True)
+        self.config.parse_all()
+        self.assertEqual(self.values()['f'], 3.0)
+        self.assertTrue(isinstance(self.values()['f'], float))
+
+    def test_parser_args_parsed_once(self):
+        calls = []
+
+        def args_parser(args):
+            calls.append(args)
+            return args.split()
+        self.config.add_parser('split', args_parser)
+        self.config.add_batch_parser('upper', self.upper)
+        for option in ('a', 'b'):
+            self.config.set('xyzzy', option + '.parser.args', 'y z')
+            self.config.set('xyzzy', option + '.parser.args.parser', 'split')
+        self.config.parse_all()
+        self.assertEqual(calls, ['y z'])
+        self.assertEqual(self.values()['a'], '1yz')
+        self.assertEqual(self.calls[0], (['1', '2'], ('y', 'z')))
+
+    def test_int_batch_parser_args(self):
+        config = TypedConfigParser()
+        config.add_parser('base', lambda args: [int(args)])
+        config.readfp(StringIO('''
+[hex]
+g = ff
+g.parser = int
+g.parser.args = 16
+g.parser.args.parser = base
+'''))
+        config.parse_all()
+        self.assertEqual(config.get('hex', 'g').value, 255)
+
+
 if __name__ == '__main__':
     unittest.main()
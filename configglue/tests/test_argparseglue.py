@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import os
+import unittest
+from io import BytesIO
+
+from mock import Mock, patch
+
+from configglue.argparseglue import schemaargparseglue
+from configglue.parser import SchemaConfigParser
+from configglue.schema import (
+    BoolOption,
+    IntOption,
+    Schema,
+    Section,
+    StringOption,
+)
+
+
+class TestSchemaArgparseGlue(unittest.TestCase):
+    def setUp(self):
+        class MySchema(Schema):
+            class foo(Section):
+                bar = IntOption()
+
+            baz = IntOption(help='The baz option')
+
+        class ToolSchema(Schema):
+            class tool(Section):
+                size = IntOption(short_name='s')
+
+            verbose = BoolOption(action='store_true')
+
+        self.parser = SchemaConfigParser(MySchema())
+        self.parser.readfp(BytesIO(b"[foo]\nbar=1"))
+        self.tool_parser = SchemaConfigParser(ToolSchema())
+
+    def get_output(self, *args, **kwargs):
+        with patch('sys.stdout') as mock_stdout:
+            self.assertRaises(SystemExit, schemaargparseglue, *args,
+                              **kwargs)
+        return ''.join(call[0][0] for call in
+                       mock_stdout.write.call_args_list)
+
+    def test_glue(self):
+        glue = schemaargparseglue(self.parser, argv=['--baz', '2'])
+        self.assertIs(glue.schema_parser, self.parser)
+        self.assertEqual(vars(glue.namespace), {'foo_bar': 1, 'baz': '2'})
+        self.assertEqual(glue.command, None)
+        self.assertEqual(self.parser.values(),
+            {'foo': {'bar': 1}, '__main__': {'baz': 2}})
+
+    def test_glue_environ(self):
+        with patch.object(os, 'environ', {'CONFIGGLUE_FOO_BAR': '42'}):
+            schemaargparseglue(self.parser, argv=[])
+        self.assertEqual(self.parser.values(),
+            {'foo': {'bar': 42}, '__main__': {'baz': 0}})
+
+    def test_help(self):
+        output = self.get_output(self.parser, argv=['--help'])
+        self.assertTrue(output.startswith('usage:'))
+        self.assertTrue('--foo_bar' in output)
+        self.assertTrue('The baz option' in output)
+
+    def test_help_default(self):
+        class MySchema(Schema):
+            foo = StringOption(help='100% of [%default]')
+
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\nfoo=all"))
+        output = self.get_output(parser, argv=['--help'])
+        self.assertTrue('100% of [all]' in output)
+
+    def test_command(self):
+        other = Mock()
+        commands = {'tool': lambda: self.tool_parser, 'other': other}
+        glue = schemaargparseglue(self.parser, commands=commands,
+            argv=['--baz', '2', 'tool', '-s', '3', '--verbose'])
+
+        self.assertEqual(vars(glue.namespace),
+                         {'foo_bar': 1, 'baz': '2', 'command': 'tool'})
+        self.assertEqual(self.parser.get('__main__', 'baz'), 2)
+        command = glue.command
+        self.assertIs(command.schema_parser, self.tool_parser)
+        self.assertEqual(vars(command.namespace),
+                         {'tool_size': '3', 'verbose': True})
+        self.assertEqual(self.tool_parser.values(),
+            {'tool': {'size': 3}, '__main__': {'verbose': True}})
+        # only the selected command is loaded
+        self.assertFalse(other.called)
+
+    def test_command_help(self):
+        commands = {'tool': lambda: self.tool_parser}
+        output = self.get_output(self.parser, commands=commands,
+                                 argv=['tool', '--help'])
+        self.assertTrue(' tool [-h]' in output)
+        self.assertTrue('--tool_size' in output)
+        self.assertFalse('--foo_bar' in output)
+
+    def test_command_not_loaded_for_help(self):
+        tool = Mock()
+        output = self.get_output(self.parser, commands={'tool': tool},
+                                 argv=['--help'])
+        self.assertTrue('{tool}' in output)
+        self.assertFalse(tool.called)
@@ -0,0 +1,129 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from configglue.bundle import build_bundle, load_bundle, main, write_bundle
+from configglue.parser import SchemaConfigParser
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+class MySchema(Schema):
+    foo = IntOption()
+    title = StringOption()
+
+    class other(Section):
+        bar = StringOption()
+
+
+class BundleTestCase(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.write('main.cfg',
+                   "[__main__]\nincludes = conf.d/a.cfg\nfoo = 1\n")
+        self.write('conf.d/a.cfg',
+                   "[__main__]\nincludes = ../b.cfg\nfoo = 2\n"
+                   "title = caf\xe9\r\n")
+        self.write('b.cfg', "[other]\nbar = from b\n")
+        self.entry = self.path('main.cfg')
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def write(self, name, content):
+        path = self.path(name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with io.open(path, 'w', encoding='utf-8', newline='') as fp:
+            fp.write(content)
+
+    def test_load_bundle(self):
+        entry, sources = load_bundle(build_bundle(self.entry),
+                                     '/srv/app.cfgbundle')
+        self.assertEqual(entry, '/srv/main.cfg')
+        self.assertEqual(sorted(sources), [
+            '/srv/b.cfg', '/srv/conf.d/a.cfg', '/srv/main.cfg'])
+        self.assertEqual(sources['/srv/conf.d/a.cfg'],
+                         "[__main__]\nincludes = ../b.cfg\nfoo = 2\n"
+                         "title = caf\xe9\r\n")
+
+    def test_load_invalid_bundle(self):
+        self.assertRaises(ValueError, load_bundle, "[__main__]\n", 'x.cfg')
+        self.assertRaises(ValueError, load_bundle,
+                          "#configglue-bundle 1\n{}\n", 'x.cfg')
+
+    def test_read_bundle(self):
+        expected = SchemaConfigParser(MySchema())
+        expected.read(self.entry)
+
+        bundle = self.path('app.cfgbundle')
+        write_bundle(self.entry, bundle)
+        parser = SchemaConfigParser(MySchema())
+        with patch('configglue.parser._read_file') as mock_read_file:
+            mock_read_file.side_effect = lambda path: (
+                io.open(path, encoding='utf-8', newline='').read())
+            read_ok = parser.read(bundle)
+
+        # only the bundle is read from disk
+        mock_read_file.assert_called_once_with(bundle)
+        self.assertEqual(read_ok, [bundle])
+        self.assertEqual(parser.values(), expected.values())
+        self.assertEqual(parser.locate('foo'), self.entry)
+        self.assertEqual(parser.locate('title'), self.path('conf.d/a.cfg'))
+
+    def test_main(self):
+        bundle = self.path('app.cfgbundle')
+        self.assertEqual(main([self.entry, bundle]), 0)
+        with io.open(bundle, encoding='utf-8', newline='') as fp:
+            self.assertEqual(fp.read(), build_bundle(self.entry))
+
+    def test_read_bundle_directory_includes(self):
+        self.write('main.cfg',
+                   "[__main__]\nincludes =\n  conf.d\n  extra/*.cfg\n")
+        self.write('extra/a.cfg', "[other]\nbar = from extra\n")
+        self.write('extra/b.txt', "[other]\nbar = ignored\n")
+        expected = SchemaConfigParser(MySchema())
+        expected.read(self.entry)
+
+        other = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other)
+        bundle = os.path.join(other, 'app.cfgbundle')
+        write_bundle(self.entry, bundle)
+        parser = SchemaConfigParser(MySchema())
+        parser.read(bundle)
+
+        self.assertEqual(parser.values(), expected.values())
+        self.assertEqual(parser.values('other'), {'bar': 'from extra'})
+        self.assertEqual(parser.locate('foo'),
+                         os.path.join(other, 'conf.d', 'a.cfg'))
+
+    def test_build_bundle_directory_include_after_file(self):
+        self.write('main.cfg',
+                   "[__main__]\nincludes =\n  extra/b.cfg\n  extra\n")
+        self.write('extra/a.cfg', "[other]\nbar = from a\n")
+        self.write('extra/b.cfg', "[other]\nbar = from b\n")
+
+        entry, sources = load_bundle(build_bundle(self.entry), 'x.cfg')
+        self.assertEqual(sorted(sources),
+                         ['extra/a.cfg', 'extra/b.cfg', 'main.cfg'])
@@ -13,12 +13,39 @@
 # For bug reports, support, and new releases: http://launchpad.net/configglue
 #
 ###############################################################################
+import subprocess
+import sys
 from unittest import TestCase
 
 from configglue.schema import ListOption, StringOption
+from configglue.contrib import schema as contrib_schema
 from configglue.contrib.schema import DjangoOpenIdAuthSchema
 
 
+class LazyImportTestCase(TestCase):
+
+    def test_schemas_imported_on_first_use(self):
+        code = (
+            "import sys\n"
+            "import configglue.contrib.schema as schema\n"
+            "assert 'configglue.contrib.schema.raven' not in sys.modules\n"
+            "schema.RavenSchema\n"
+            "assert 'configglue.contrib.schema.raven' in sys.modules\n"
+            "assert 'configglue.contrib.schema.nexus' not in sys.modules\n")
+        self.assertEqual(subprocess.call([sys.executable, '-c', code]), 0)
+
+    def test_all_schemas_available(self):
+        import configglue.contrib
+        for name in contrib_schema.__all__:
+            schema = getattr(contrib_schema, name)
+            self.assertEqual(schema.__name__, name)
+            self.assertEqual(getattr(configglue.contrib, name), schema)
+            self.assertTrue(name in dir(contrib_schema))
+
+    def test_unknown_attribute(self):
+        self.assertRaises(AttributeError, getattr, contrib_schema, 'Foo')
+
+
 class DjangoOpenIdAuthSchemaTestCase(TestCase):
 
     def test_openid_launchpad_teams_required_option(self):
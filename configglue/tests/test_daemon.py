@@ -0,0 +1,120 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from mock import patch
+
+from configglue import daemon
+from configglue.daemon import ConfigClient, ConfigServer, ConfigStore
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+class MySchema(Schema):
+    foo = IntOption()
+
+    class other(Section):
+        bar = StringOption()
+
+
+class DaemonTestCase(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.config = os.path.join(self.folder, 'main.cfg')
+        self.write("[__main__]\nfoo = 1\nincludes = other.cfg\n")
+        with open(os.path.join(self.folder, 'other.cfg'), 'w') as fp:
+            fp.write("[other]\nbar = baz\n")
+
+        self.store = ConfigStore(MySchema(), [self.config],
+                                 check_interval=0)
+        self.socket_path = os.path.join(self.folder, 'config.sock')
+        self.server = ConfigServer(self.socket_path, self.store)
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  args=(0.01,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def write(self, content, mtime=None):
+        with open(self.config, 'w') as fp:
+            fp.write(content)
+        if mtime is not None:
+            os.utime(self.config, (mtime, mtime))
+
+    def test_fetch(self):
+        client = ConfigClient(self.socket_path, timeout=5)
+        self.assertEqual(client.values(),
+                         {'__main__': {'foo': 1}, 'other': {'bar': 'baz'}})
+        self.assertEqual(client.version, self.store.version)
+
+    def test_fetch_cached(self):
+        client = ConfigClient(self.socket_path, timeout=5)
+        snapshot = client.fetch()
+        # the snapshot is not sent again while current
+        self.assertIs(client.fetch(), snapshot)
+
+    def test_reload(self):
+        client = ConfigClient(self.socket_path, timeout=5)
+        client.fetch()
+        version = client.version
+        self.write("[__main__]\nfoo = 2\nincludes = other.cfg\n", mtime=0)
+
+        self.assertEqual(client.values('__main__'), {'foo': 2})
+        self.assertEqual(client.version, version + 1)
+
+    def test_reload_unchanged_values(self):
+        version = self.store.version
+        self.write("[__main__]\nincludes = other.cfg\nfoo = 1\n", mtime=0)
+        self.assertEqual(self.store.current()[0], version)
+
+    def test_reload_invalid_config(self):
+        client = ConfigClient(self.socket_path, timeout=5)
+        client.fetch()
+        version = client.version
+        for mtime, content in enumerate(("[__main__]\nfoo = bar\n",
+                                         "foo = 2\n")):
+            self.write(content, mtime=mtime)
+            with patch.object(daemon, 'logger') as mock_logger:
+                self.assertEqual(client.values('__main__'), {'foo': 1})
+            self.assertTrue(mock_logger.exception.called)
+            self.assertEqual(client.version, version)
+
+        self.write("[__main__]\nfoo = 2\n", mtime=2)
+        self.assertEqual(client.values('__main__'), {'foo': 2})
+
+    def test_versions_not_reused(self):
+        client = ConfigClient(self.socket_path, timeout=5)
+        client.fetch()
+        time.sleep(0.01)
+        store = ConfigStore(MySchema(), [self.config])
+        self.assertTrue(store.version > client.version)
+
+    def test_invalid_request(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.connect(self.socket_path)
+        sock.sendall(b'GET latest\n')
+        self.assertEqual(sock.makefile('rb').readline(),
+                         b'ERROR invalid request\n')
@@ -0,0 +1,107 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from io import BytesIO
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from configglue._compat import PY2
+from configglue.diff import (
+    Change,
+    apply_patch,
+    changed_sections,
+    diff,
+    section_digests,
+)
+from configglue.parser import SchemaConfigParser
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+class MySchema(Schema):
+    foo = IntOption()
+    bar = StringOption()
+
+    class baz(Section):
+        qux = IntOption()
+
+
+def make_parser(config, location=None):
+    parser = SchemaConfigParser(MySchema())
+    parser.readfp(BytesIO(config), location)
+    return parser
+
+
+class DiffTestCase(TestCase):
+    def setUp(self):
+        self.old = make_parser(b"[__main__]\nfoo = 1\nbar = x\n"
+                               b"[baz]\nqux = 2", 'old.cfg')
+        self.new = make_parser(b"[__main__]\nfoo = 3\n"
+                               b"[baz]\nqux = 2\n[extra]\nspam = eggs",
+                               'new.cfg')
+
+    def test_no_changes(self):
+        self.assertEqual(diff(self.old, self.old), [])
+
+    def test_diff(self):
+        self.assertEqual(diff(self.old, self.new), [
+            Change('__main__', 'bar', 'x', None, 'old.cfg'),
+            Change('__main__', 'foo', '1', '3', 'new.cfg'),
+            # locations are only known for schema options
+            Change('extra', 'spam', None, 'eggs', None),
+        ])
+
+    def test_diff_does_not_parse(self):
+        new = make_parser(b"[__main__]\nfoo = %(missing)s")
+        self.assertEqual(diff(self.old, new)[1],
+            Change('__main__', 'foo', '1', '%(missing)s', None))
+
+    def test_section_digests(self):
+        old_digests = section_digests(self.old)
+        new_digests = section_digests(self.new)
+        self.assertEqual(old_digests['baz'], new_digests['baz'])
+        self.assertEqual(changed_sections(old_digests, new_digests),
+                         ['__main__', 'extra'])
+        self.assertEqual(
+            diff(self.old, self.new, sections=['extra']),
+            [Change('extra', 'spam', None, 'eggs', None)])
+
+    def test_apply_patch(self):
+        apply_patch(self.old, diff(self.old, self.new))
+        self.assertEqual(diff(self.old, self.new), [])
+        self.assertEqual(self.old.get('__main__', 'foo'), 3)
+        # changes are saved to the files of the patched parser
+        self.assertEqual(self.old.locate('foo'), 'old.cfg')
+        self.assertEqual(self.old._dirty, {
+            'old.cfg': {'__main__': {'foo': '3', 'bar': None}},
+            None: {'extra': {'spam': 'eggs'}}})
+        if not PY2:
+            self.assertEqual(self.old['extra'].name, 'extra')
+
+    def test_apply_patch_save(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, 'old.cfg')
+        with open(path, 'w') as fp:
+            fp.write("[__main__]\nfoo = 1\nbar = x\n[baz]\nqux = 2\n")
+        old = SchemaConfigParser(MySchema())
+        old.read(path)
+
+        apply_patch(old, diff(old, self.new))
+        old.save()
+        saved = SchemaConfigParser(MySchema())
+        saved.read(path)
+        self.assertEqual(diff(saved, self.new), [])
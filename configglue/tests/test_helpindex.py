@@ -0,0 +1,160 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+from optparse import OptionParser
+
+from mock import patch
+
+from configglue._compat import PY2
+from configglue.glue import configglue, schemaconfigglue
+from configglue.helpindex import HelpIndex, help_requested
+from configglue.parser import SchemaConfigParser
+from configglue.schema import (
+    BoolOption,
+    IntOption,
+    ListOption,
+    Schema,
+    Section,
+    StringOption,
+    merge,
+)
+
+
+class MySchema(Schema):
+    foo = IntOption(short_name='f', help='The foo option [%default]')
+    bar = BoolOption(action='store_true', help='The bar option')
+
+    class baz(Section):
+        qux = StringOption(default='quux', help='The qux option [%default]')
+        fatal = ListOption(fatal=True, help='Required [%default]')
+
+
+def make_option_parser():
+    op = OptionParser(usage='%prog [options]', prog='app')
+    op.add_option('--validate', action='store_true', help='validate')
+    return op
+
+
+class HelpRequestedTestCase(unittest.TestCase):
+    def test_help_requested(self):
+        self.assertTrue(help_requested(['--help']))
+        self.assertTrue(help_requested(['--foo', '1', '-h']))
+        self.assertFalse(help_requested([]))
+        self.assertFalse(help_requested(['--foo', '--', '--help']))
+
+
+class HelpIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'help.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_from_schema(self):
+        index = HelpIndex.from_schema(MySchema())
+        self.assertEqual(index.schema,
+                         'configglue.tests.test_helpindex.MySchema')
+        self.assertEqual(sorted(dict(index.sections)['baz']), [
+            ('baz_fatal', '', 'baz_fatal', True, 'Required [%default]',
+             None),
+            ('baz_qux', '', 'baz_qux', True, 'The qux option [%default]',
+             'quux'),
+        ])
+
+    def test_format_help(self):
+        """Test the help matches the help of schemaconfigglue."""
+        expected_op = make_option_parser()
+        schemaconfigglue(SchemaConfigParser(MySchema()), op=expected_op,
+                         argv=[])
+
+        index = HelpIndex.from_schema(MySchema())
+        op = make_option_parser()
+        self.assertEqual(index.format_help(op), expected_op.format_help())
+        # the original option parser is left untouched
+        self.assertEqual(len(op.option_list), 2)
+        self.assertEqual(op.option_groups, [])
+
+    def test_save_load(self):
+        index = HelpIndex.from_schema(MySchema())
+        index.save(self.path)
+        loaded = HelpIndex.load(self.path)
+        self.assertEqual(loaded.sections, index.sections)
+        self.assertEqual(loaded.schema, index.schema)
+        self.assertEqual(loaded.fingerprint, index.fingerprint)
+        self.assertEqual(loaded.format_help(), index.format_help())
+
+    def test_load_other_version(self):
+        with open(self.path, 'w') as fp:
+            fp.write('{"version": 0}')
+        self.assertRaises(ValueError, HelpIndex.load, self.path)
+
+    def test_cached(self):
+        index = HelpIndex.cached(self.path, MySchema)
+        self.assertTrue(os.path.exists(self.path))
+
+        with patch.object(HelpIndex, 'from_schema') as mock_from_schema:
+            cached = HelpIndex.cached(self.path, MySchema)
+        self.assertFalse(mock_from_schema.called)
+        self.assertEqual(cached.sections, index.sections)
+
+    def test_cached_other_schema(self):
+        class OtherSchema(Schema):
+            foo = IntOption()
+
+        HelpIndex.cached(self.path, MySchema)
+        index = HelpIndex.cached(self.path, OtherSchema)
+        self.assertEqual(index.sections,
+                         [('__main__', [('foo', '', 'foo', True, '', '0')])])
+
+    def test_cached_same_name(self):
+        class OtherSchema(Schema):
+            other = IntOption()
+
+        HelpIndex.cached(self.path, merge(MySchema))
+        index = HelpIndex.cached(self.path, merge(MySchema, OtherSchema))
+        names = [item[0] for name, items in index.sections for item in items]
+        self.assertTrue('other' in names)
+
+    def test_cached_stale(self):
+        HelpIndex.cached(self.path, MySchema)
+        os.utime(self.path, (0, 0))
+        with patch.object(HelpIndex, 'from_schema') as mock_from_schema:
+            HelpIndex.cached(self.path, MySchema)
+        self.assertTrue(mock_from_schema.called)
+
+    @patch('configglue.glue.SchemaConfigParser')
+    def test_configglue_help_index(self, mock_schema_parser):
+        with patch.object(sys, 'argv', ['app', '--help']):
+            new_callable = StringIO
+            if PY2:
+                new_callable = BytesIO
+            with patch('sys.stdout', new_callable=new_callable) as mock_stdout:
+                self.assertRaises(SystemExit, configglue, MySchema,
+                    ['app.cfg'], op=make_option_parser(),
+                    help_index=self.path)
+
+        output = mock_stdout.getvalue()
+        if PY2:
+            output = output.decode('utf-8')
+        self.assertTrue('--baz_qux=BAZ_QUX' in output)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(mock_schema_parser.called)
@@ -0,0 +1,66 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+
+
+# cumulative time budget for importing configglue.app, in microseconds
+IMPORT_BUDGET = 150000
+
+# modules only imported once they are used
+DEFERRED_MODULES = [
+    'hashlib',
+    'inspect',
+    'json',
+    'logging',
+    'xdg.BaseDirectory',
+]
+
+
+def run_python(*args):
+    process = subprocess.Popen([sys.executable] + list(args),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    return stdout.decode('utf-8'), stderr.decode('utf-8')
+
+
+class ImportTestCase(TestCase):
+    def test_deferred_modules(self):
+        stdout, stderr = run_python('-c', (
+            "import sys\n"
+            "import configglue.app\n"
+            "print(','.join(sorted(sys.modules)))\n"))
+        imported = set(stdout.strip().split(','))
+        self.assertEqual(
+            [name for name in DEFERRED_MODULES if name in imported], [])
+
+    @skipIf(sys.version_info < (3, 7), "-X importtime requires python 3.7")
+    def test_import_time_budget(self):
+        stdout, stderr = run_python('-X', 'importtime', '-c',
+                                    'import configglue.app')
+        # lines look like 'import time: self | cumulative | module'
+        for line in stderr.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if fields[-1] == 'configglue.app':
+                cumulative = int(fields[1])
+                break
+        else:
+            self.fail("configglue.app not found in:\n" + stderr)
+        self.assertTrue(cumulative < IMPORT_BUDGET,
+            "importing configglue.app took {0}us, over the {1}us "
+            "budget".format(cumulative, IMPORT_BUDGET))
@@ -0,0 +1,142 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import TestCase
+
+from configglue._compat import PY2, BaseConfigParser, configparser
+from configglue._lexer import apply_tokens, supports, tokenize
+from configglue.parser import SchemaConfigParser
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+# config files exercising the corners of the ini syntax
+CONFORMANCE_CASES = [
+    "",
+    "[a]\nfoo = 1\nbar: 2\nbaz=3",
+    "[a]\nfoo = 1\n  two\n\tthree\n\nbar = 4\n",
+    "[a]\nfoo = 1\n\n  after blank\nbar = 2\n",
+    "# comment\n; other comment\n[a]\nfoo = 1 ; inline\nbar = x;y\n",
+    "rem a comment\nREM another\n[a]\nremote = 1\n",
+    "[a]\nfoo = \"\"\nbar =\nbaz = ;\n",
+    "[a]\nFoo Bar = spaced name\nkey:with=delims\n",
+    "[a]\r\nfoo = 1\r\nbar = 2\r\n",
+    "[DEFAULT]\nbase = 1\n[a]\nfoo = %(base)s\n",
+    "[a]\nfoo = 1\n[b]\nfoo = 2\n[a]\nbar = 3\n",
+    "[a]\nfoo = 1\nfoo = 2\n",
+    "[a] trailing\n[b]]\nfoo = 1\n",
+    "[a]\nfoo = 1\nnot an option\n  continued\n",
+    "[a]\n=no name\n  continued\nbar = 1\n",
+    "[a]\n  indented = 1\n",
+    "foo = 1\n[a]\n",
+    "  \n# only comments\n",
+    "[a]\nfoo = caf\xe9\n\xa0bar = 1\n",
+    "[a]\nfoo = 1\n    # not a comment?\n    ; nor this\n",
+]
+
+
+def stdlib_read(parser, text):
+    parser._read(StringIO(text), '<test>')
+
+
+def lexer_read(parser, text):
+    apply_tokens(parser, tokenize(text, parser), '<test>')
+
+
+class ConformanceTestCase(TestCase):
+    def read(self, read, text, **kwargs):
+        parser = BaseConfigParser(**kwargs)
+        try:
+            read(parser, text)
+        except configparser.Error as e:
+            error = (type(e), str(e))
+        else:
+            error = None
+        # python 2 leaves multi-line values unjoined on errors
+        sections = [(name, self.joined(options))
+                    for name, options in parser._sections.items()]
+        return sections, self.joined(parser._defaults), error
+
+    def joined(self, options):
+        return dict((name, '\n'.join(value) if isinstance(value, list)
+                     else value) for name, value in options.items())
+
+    def check(self, **kwargs):
+        for text in CONFORMANCE_CASES:
+            self.assertEqual(self.read(lexer_read, text, **kwargs),
+                             self.read(stdlib_read, text, **kwargs),
+                             "config read differently:\n" + text)
+
+    def test_conformance(self):
+        self.check()
+
+    if not PY2:
+        def test_conformance_not_strict(self):
+            self.check(strict=False)
+
+        def test_conformance_no_empty_lines_in_values(self):
+            self.check(empty_lines_in_values=False)
+
+        def test_inline_comments_not_supported(self):
+            parser = BaseConfigParser(inline_comment_prefixes=(';',))
+            self.assertFalse(supports(parser))
+
+    def test_supports_default_parser(self):
+        self.assertTrue(supports(BaseConfigParser()))
+
+
+class PositionsTestCase(TestCase):
+    def test_positions(self):
+        class MySchema(Schema):
+            foo = IntOption()
+
+            class bar(Section):
+                baz = StringOption()
+
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\nfoo = 1\n\n[bar]\n"
+                              b"\nbaz = a\n  b\n"), 'my.cfg')
+        self.assertEqual(parser._positions, {
+            ('__main__', 'foo'): ('my.cfg', 2),
+            ('bar', 'baz'): ('my.cfg', 6),
+        })
+        self.assertEqual(parser.locate('foo'), 'my.cfg')
+        self.assertEqual(parser.locate('baz'), 'my.cfg')
+
+    def test_positions_read_files(self):
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption()
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        first = os.path.join(folder, 'first.cfg')
+        second = os.path.join(folder, 'second.cfg')
+        with open(first, 'w') as fp:
+            fp.write("[__main__]\nfoo = 1\n")
+        with open(second, 'w') as fp:
+            fp.write("[__main__]\n\nbar = 2\n")
+
+        parser = SchemaConfigParser(MySchema())
+        parser.read([first, second])
+        self.assertEqual(parser._positions, {
+            ('__main__', 'foo'): (first, 2),
+            ('__main__', 'bar'): (second, 3),
+        })
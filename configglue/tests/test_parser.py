@@ -17,12 +17,15 @@
 from __future__ import unicode_literals
 
 import codecs
+import copy
 import os
+import pickle
 import shutil
 import tempfile
 import textwrap
 import unittest
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest import skipIf
 
 from mock import (
     MagicMock,
@@ -32,6 +35,8 @@ from mock import (
 
 from configglue._compat import iteritems
 from configglue._compat import (
+    PY2,
+    BaseConfigParser,
     DEFAULTSECT,
     InterpolationDepthError,
     InterpolationMissingOptionError,
@@ -43,6 +48,9 @@ from configglue.parser import (
     CONFIG_FILE_ENCODING,
     SchemaConfigParser,
     SchemaValidationError,
+    dumps,
+    loads,
+    scan_dir,
 )
 from configglue.schema import (
     BoolOption,
@@ -93,7 +101,7 @@ class TestIncludes(unittest.TestCase):
         self.assertEqual(expected_location, location)
 
     @patch('configglue.parser.logger.warn')
-    @patch('configglue.parser.codecs.open')
+    @patch('configglue.parser.open', create=True)
     def test_read_ioerror(self, mock_open, mock_warn):
         mock_open.side_effect = IOError
 
@@ -254,6 +262,75 @@ class TestIncludes(unittest.TestCase):
         # make sure we leave the basedir clean
         self.assertEqual(parser._basedir, '')
 
+    def conf_d_schema(self):
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption()
+            baz = IntOption()
+        return MySchema()
+
+    def make_conf_d(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        os.mkdir("%s/conf.d" % folder)
+        for name, foo in [('20-b.cfg', 2), ('10-a.cfg', 1), ('30-c.ini', 3),
+                          ('40-d.cfg', 4)]:
+            f = codecs.open("%s/conf.d/%s" % (folder, name), 'w',
+                            encoding=CONFIG_FILE_ENCODING)
+            f.write("[__main__]\nfoo=%d\nbar=%d" % (foo, foo))
+            f.close()
+        return folder
+
+    def test_include_directory(self):
+        folder = self.make_conf_d()
+        config = BytesIO(b"[__main__]\nincludes = conf.d\nbar = 0")
+
+        parser = SchemaConfigParser(self.conf_d_schema())
+        parser.readfp(config, "%s/main.cfg" % folder)
+        # *.cfg files are read in name order
+        self.assertEqual(parser.values(),
+                         {'__main__': {'foo': 4, 'bar': 0, 'baz': 0}})
+        self.assertEqual(parser.locate('foo'),
+                         "%s/conf.d/40-d.cfg" % folder)
+
+    def test_include_glob(self):
+        folder = self.make_conf_d()
+        config = BytesIO(b"[__main__]\nincludes = conf.d/[23]0-*")
+
+        parser = SchemaConfigParser(self.conf_d_schema())
+        parser.readfp(config, "%s/main.cfg" % folder)
+        self.assertEqual(parser.values(),
+                         {'__main__': {'foo': 3, 'bar': 3, 'baz': 0}})
+
+    def test_include_glob_no_match(self):
+        folder = self.make_conf_d()
+        config = BytesIO(b"[__main__]\nincludes = missing/*.cfg\nfoo = 5")
+
+        parser = SchemaConfigParser(self.conf_d_schema())
+        parser.readfp(config, "%s/main.cfg" % folder)
+        self.assertEqual(parser.values(),
+                         {'__main__': {'foo': 5, 'bar': 0, 'baz': 0}})
+
+    def test_scan_dir_cached(self):
+        folder = self.make_conf_d()
+        path = "%s/conf.d" % folder
+        names = ['10-a.cfg', '20-b.cfg', '30-c.ini', '40-d.cfg']
+        self.assertEqual(scan_dir(path), names)
+        with patch('configglue.parser.os.listdir') as mock_listdir:
+            self.assertEqual(scan_dir(path), names)
+            self.assertFalse(mock_listdir.called)
+        self.assertEqual(scan_dir("%s/conf.d/10-a.cfg" % folder), None)
+        self.assertEqual(scan_dir("%s/missing" % folder), None)
+
+    def test_scan_dir_changed(self):
+        folder = self.make_conf_d()
+        path = "%s/conf.d" % folder
+        scan_dir(path)
+        os.remove("%s/conf.d/10-a.cfg" % folder)
+        # make sure the modification time changes
+        os.utime(path, (0, 0))
+        self.assertEqual(scan_dir(path), ['20-b.cfg', '30-c.ini', '40-d.cfg'])
+
 
 class TestInterpolation(unittest.TestCase):
     """Test basic interpolation."""
@@ -861,6 +938,45 @@ class TestSchemaConfigParser(unittest.TestCase):
         parser.readfp(config)
         self.assertRaises(NoOptionError, parser.values)
 
+    def test_parse_all_scalars(self):
+        """Test parse_all parses plain scalar values in batches."""
+        class MySchema(Schema):
+            foo = BoolOption()
+            bar = IntOption()
+            baz = IntOption()
+        config = BytesIO(b"[__main__]\nfoo = Yes\nbar = 1\nbaz = 2")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config)
+        self.assertEqual(parser._parse_scalars(parser.schema.section(
+            '__main__')), [])
+        parser.parse_all()
+
+    def test_parse_all_scalars_invalid_value(self):
+        """Test parse_all reports which batched value is invalid."""
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption()
+        config = BytesIO(b"[__main__]\nfoo = 1\nbar = x")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config)
+        try:
+            parser.parse_all()
+        except ValueError as e:
+            self.assertTrue("IntOption 'bar'" in str(e))
+        else:
+            self.fail('ValueError not raised')
+
+    def test_parse_all_scalars_interpolated(self):
+        """Test parse_all leaves values needing interpolation to get."""
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption()
+        config = BytesIO(b"[__main__]\nfoo = 1\nbar = $BAR")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config)
+        pending = parser._parse_scalars(parser.schema.section('__main__'))
+        self.assertEqual(pending, [parser.schema.bar])
+
     def test_extra_sections(self):
         """Test extra_sections."""
         class MySchema(Schema):
@@ -953,6 +1069,48 @@ class TestSchemaConfigParser(unittest.TestCase):
         self.assertRaises(NoSectionError,
                           self.parser._get_default, 'foo', 'bar')
 
+    def test_get_default_without_exceptions(self):
+        """Defaulted options are looked up without raising internally."""
+        class MySchema(Schema):
+            class foo(Section):
+                bar = IntOption(default=3)
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[foo]\n"))
+
+        with patch.object(BaseConfigParser, 'get') as mock_get:
+            with patch.object(parser, '_get_default') as mock_default:
+                value = parser.get('foo', 'bar')
+        self.assertEqual(value, 3)
+        self.assertFalse(mock_get.called)
+        self.assertFalse(mock_default.called)
+
+    def test_get_fatal_option(self):
+        class MySchema(Schema):
+            foo = IntOption(fatal=True)
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\n"))
+
+        self.assertRaises(NoOptionError, parser.get, '__main__', 'foo')
+        self.assertRaises(NoOptionError, parser.get, '__main__', 'bar')
+        self.assertRaises(NoSectionError, parser.get, 'baz', 'foo')
+
+    def test_get_undefined_environment_var_uses_default(self):
+        class MySchema(Schema):
+            foo = StringOption(default='bar')
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\nfoo = $UNDEFINED_VAR\n"))
+
+        with patch.object(os, 'environ', {}):
+            self.assertEqual(parser.get('__main__', 'foo'), 'bar')
+
+    @skipIf(PY2, "fallback is only supported on python 3")
+    def test_get_fallback(self):
+        self.parser.readfp(self.config)
+        self.assertEqual(self.parser.get('__main__', 'foo', fallback='x'),
+                         'bar')
+        self.assertEqual(self.parser.get('__main__', 'baz', fallback='x'),
+                         'x')
+
     def test_multi_file_dict_config(self):
         """Test parsing a dict option spanning multiple files."""
         class MySchema(Schema):
@@ -1026,6 +1184,43 @@ class TestSchemaConfigParser(unittest.TestCase):
         self.parser.read(files)
         self.assertEqual(self.parser.values(), {'__main__': {'foo': 'bar'}})
 
+    def test_read_multiple_files_concurrently(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        files = []
+        for i in range(5):
+            path = "%s/%d.cfg" % (folder, i)
+            f = codecs.open(path, 'w', encoding=CONFIG_FILE_ENCODING)
+            f.write("[__main__]\nfoo=%d" % i)
+            f.close()
+            files.append(path)
+        files.insert(2, "%s/missing.cfg" % folder)
+
+        read_ok = self.parser.read(files, workers=3)
+        self.assertEqual(read_ok, files[:2] + files[3:])
+        # files are merged in the given order
+        self.assertEqual(self.parser.values(), {'__main__': {'foo': '4'}})
+
+    def test_readfp_sources(self):
+        content = "[__main__]\nfoo = caf\xe9".encode(CONFIG_FILE_ENCODING)
+        for source in (content, bytearray(content), memoryview(content),
+                       BytesIO(content),
+                       StringIO(content.decode(CONFIG_FILE_ENCODING))):
+            parser = SchemaConfigParser(self.schema)
+            parser.readfp(source)
+            self.assertEqual(parser.items('__main__'), [('foo', 'caf\xe9')])
+
+    def test_readfp_file_descriptor(self):
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        os.write(write_fd, b"[__main__]\nfoo = piped")
+        os.close(write_fd)
+
+        self.parser.readfp(read_fd, '<pipe>')
+        self.assertEqual(self.parser.items('__main__'), [('foo', 'piped')])
+        # the descriptor is left open
+        self.assertEqual(os.read(read_fd, 1), b'')
+
     def test_interpolate_using_noschema_from_multiple_files(self):
         """Test interpolation across files."""
         def setup_config():
@@ -1168,6 +1363,58 @@ class TestSchemaConfigParser(unittest.TestCase):
             # remove the file
             os.unlink(filename)
 
+    def test_write_one_section_at_a_time(self):
+        class MySchema(Schema):
+            foo = IntOption()
+
+            class bar(Section):
+                baz = BoolOption()
+
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[bar]\nbaz = yes\nextra = 1\n"
+                              b"[__noschema__]\nqux = %(x)s"))
+        fp = Mock()
+        parser.write(fp)
+        self.assertEqual([args[0] for args, kwargs in fp.write.call_args_list],
+            ["[bar]\nbaz = True\nextra = 1\n\n",
+             "[__noschema__]\nqux = %(x)s\n\n",
+             "[__main__]\nfoo = 0\n\n"])
+        # writing leaves the parser state alone
+        self.assertEqual(parser._dirty, {})
+        self.assertFalse(parser.has_section('__main__'))
+
+    def test_write_debug_checks_round_trip(self):
+        class MySchema(Schema):
+            foo = IntOption()
+
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\nfoo = 2"))
+        parser.debug = True
+        with patch.object(parser, 'values', side_effect=[{'foo': 2},
+                                                         {'foo': 3}]):
+            self.assertRaises(AssertionError, parser.write, Mock())
+
+    def test_write_debug_with_includes(self):
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption()
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        with open(os.path.join(folder, 'other.cfg'), 'w') as fp:
+            fp.write("[__main__]\nfoo = 1\nbar = 1\n")
+        main = os.path.join(folder, 'main.cfg')
+        with open(main, 'w') as fp:
+            fp.write("[__main__]\nincludes = other.cfg\nbar = 2\n")
+
+        parser = SchemaConfigParser(MySchema())
+        with open(main) as fp:
+            parser.readfp(fp, main)
+        parser.debug = True
+        fp = StringIO()
+        parser.write(fp)
+        self.assertTrue('includes = other.cfg\n' in fp.getvalue())
+
     def test_save_config(self):
         expected = '[__main__]\nfoo = 42'
         self._check_save_file(expected)
@@ -1258,6 +1505,53 @@ class TestSchemaConfigParser(unittest.TestCase):
         # new value goes into last read config file
         self.assertTrue('baz = 42' in data)
 
+    def test_save_config_same_files_keeps_comments(self):
+        class MySchema(Schema):
+            foo = StringOption()
+            bar = StringOption()
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        filename = "%s/first.cfg" % folder
+        content = ("# my config\n[__main__]\n; the foo\nfoo=1\n"
+                   "bar = multi\n    line\n")
+        with codecs.open(filename, 'w', encoding=CONFIG_FILE_ENCODING) as f:
+            f.write(content)
+
+        parser = SchemaConfigParser(MySchema())
+        parser.read(filename)
+        parser.set('__main__', 'foo', '42')
+        parser.save()
+        data = codecs.open(filename, encoding=CONFIG_FILE_ENCODING).read()
+        self.assertEqual(data, content.replace('foo=1', 'foo = 42'))
+        # saved changes are no longer dirty
+        self.assertEqual(parser._dirty, {})
+
+    def test_save_config_same_files_all_or_nothing(self):
+        class MySchema(Schema):
+            foo = StringOption()
+            bar = StringOption()
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        files = ["%s/first.cfg" % folder, "%s/second.cfg" % folder]
+        for filename, option in zip(files, ['foo', 'bar']):
+            with codecs.open(filename, 'w',
+                             encoding=CONFIG_FILE_ENCODING) as f:
+                f.write("[__main__]\n%s = 1\n" % option)
+
+        parser = SchemaConfigParser(MySchema())
+        parser.read(files)
+        parser.set('__main__', 'foo', '2')
+        parser.set('__main__', 'bar', '2')
+        with patch('configglue._save.os.fsync', side_effect=OSError):
+            self.assertRaises(OSError, parser.save)
+        for filename in files:
+            data = codecs.open(filename, encoding=CONFIG_FILE_ENCODING).read()
+            self.assertTrue(data.endswith(' = 1\n'))
+        self.assertEqual(sorted(os.listdir(folder)),
+                         ['first.cfg', 'second.cfg'])
+
     def test_save_config_last_location_nested_includes(self):
         def setup_config():
             folder = tempfile.mkdtemp()
@@ -1385,6 +1679,64 @@ class TestParserIsValid(unittest.TestCase):
 
         self.assertFalse(parser.is_valid())
 
+    def test_is_not_valid_reports_all_errors(self):
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption()
+            baz = BoolOption()
+            required = IntOption(fatal=True)
+
+            class other(Section):
+                qux = IntOption()
+
+        config = BytesIO(b"[__main__]\nfoo = x\nbar = 1\nbaz = maybe\n"
+                         b"unknown = 1\n[other]\nqux = y\n")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config, 'my.cfg')
+
+        valid, errors = parser.is_valid(report=True)
+        self.assertFalse(valid)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(sorted(errors[:2]), [
+            "Configuration includes invalid options for section "
+            "'__main__': unknown (my.cfg, line 5)",
+            "Configuration missing required options for section "
+            "'__main__': required",
+        ])
+        # value errors follow, with the position of the value
+        self.assertEqual(
+            sorted((error.split(' ')[2], error[error.rindex(' ('):])
+                   for error in errors[2:]),
+            [("'maybe'", " (my.cfg, line 4)"),
+             ("'x'", " (my.cfg, line 2)"),
+             ("'y'", " (my.cfg, line 7)")])
+
+    def test_is_valid_dict_sections_without_parse_all(self):
+        class MySchema(Schema):
+            foo = DictOption(spec={'bar': IntOption()})
+
+        config = BytesIO(b"[__main__]\nfoo=mydict\n[mydict]\nbar=1")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config)
+
+        self.assertEqual(parser.is_valid(report=True), (True, []))
+
+    def test_parse_all_collects_errors(self):
+        class MySchema(Schema):
+            foo = IntOption()
+            bar = IntOption(fatal=True)
+
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\nfoo = x"))
+
+        errors = []
+        parser.parse_all(errors=errors)
+        self.assertEqual([(section, option, type(error))
+                          for section, option, error in errors],
+                         [('__main__', 'foo', ValueError),
+                          ('__main__', 'bar', NoOptionError)])
+        self.assertRaises(ValueError, parser.parse_all)
+
     def test_parse_invalid_section(self):
         config = BytesIO(b"[bar]\nbaz=foo")
         self.parser.readfp(config)
@@ -1418,6 +1770,21 @@ class TestParserIsValid(unittest.TestCase):
 
         self.assertFalse(parser.is_valid())
 
+    def test_unresolved_fatal_option(self):
+        """Test parser.is_valid with a fatal option failing to resolve."""
+        class MySchema(Schema):
+            foo = IntOption(fatal=True)
+
+        config = BytesIO(b"[__main__]\nfoo = $UNDEFINED_VAR")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config)
+
+        with patch.object(os, 'environ', {}):
+            valid, errors = parser.is_valid(report=True)
+        self.assertFalse(valid)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith("No option "))
+
     def test_missing_nonfatal_options(self):
         """Test parser.is_valid when missing non-fatal options."""
         class MySchema(Schema):
@@ -1633,5 +2000,65 @@ swoosh = 4
         self.assertTrue(parser.is_valid())
 
 
+class PickledSchema(Schema):
+    foo = IntOption()
+
+    class bar(Section):
+        baz = StringOption()
+
+
+class TestParserPickle(unittest.TestCase):
+    def setUp(self):
+        self.parser = SchemaConfigParser(PickledSchema())
+        self.parser.readfp(BytesIO(
+            b"[__main__]\nfoo = 1\n[bar]\nbaz = %(foo)s\n[__noschema__]\n"
+            b"foo = x\n[DEFAULT]\nqux = 2\n"), 'my.cfg')
+        self.parser.set('bar', 'baz', 'changed')
+
+    def assert_restored(self, parser):
+        self.assertIsInstance(parser.schema, PickledSchema)
+        self.assertEqual(parser.values(), self.parser.values())
+        self.assertEqual(parser._sections, self.parser._sections)
+        self.assertEqual(parser._defaults, self.parser._defaults)
+        self.assertEqual(parser._location, self.parser._location)
+        self.assertEqual(parser._positions, self.parser._positions)
+        self.assertEqual(parser._dirty, self.parser._dirty)
+        self.assertEqual(parser.items('bar'), self.parser.items('bar'))
+
+    def test_dumps_loads(self):
+        self.assert_restored(loads(dumps(self.parser)))
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.assert_restored(
+                pickle.loads(pickle.dumps(self.parser, protocol)))
+
+    def test_pickle_keeps_dirty_defaultdict(self):
+        parser = loads(dumps(self.parser))
+        parser.set('__main__', 'foo', 3)
+        self.assertEqual(parser._dirty['my.cfg'],
+                         {'__main__': {'foo': '3'}, 'bar': {'baz': 'changed'}})
+
+    def test_schema_by_reference(self):
+        self.assertEqual(self.parser.__reduce__()[1][1],
+                         'configglue.tests.test_parser:PickledSchema')
+
+    def test_copy_local_schema(self):
+        class MySchema(Schema):
+            foo = IntOption()
+
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(b"[__main__]\nfoo = 1"))
+        copied = copy.deepcopy(parser)
+        self.assertIsInstance(copied.schema, MySchema)
+        self.assertEqual(copied.values(), parser.values())
+
+    def test_unsupported_version(self):
+        state = self.parser.__getstate__()
+        state['version'] = 0
+        parser = SchemaConfigParser(PickledSchema())
+        self.assertRaises(ValueError, parser.__setstate__, state)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from configglue._lexer import _GREEDY_HEADER
+from configglue._save import save_files, update_lines
+
+
+class UpdateLinesTestCase(TestCase):
+    def update(self, text, sections):
+        lines = io.StringIO(text).readlines()
+        return ''.join(update_lines(lines, sections))
+
+    def test_replace_in_place(self):
+        text = ("# leading comment\n"
+                "[__main__]\n"
+                "foo = 1\n"
+                "; about bar\n"
+                "bar : 2\n"
+                "\n"
+                "[other]\n"
+                "foo = 3\n")
+        self.assertEqual(self.update(text, {'__main__': {'bar': '42'}}),
+                         text.replace('bar : 2', 'bar = 42'))
+
+    def test_replace_multiline_value(self):
+        text = "[s]\nfoo = a\n    b\nbar = 1\n"
+        self.assertEqual(self.update(text, {'s': {'foo': 'x\ny'}}),
+                         "[s]\nfoo = x\n\ty\nbar = 1\n")
+
+    def test_replace_value_with_blank_lines(self):
+        text = "[s]\nfoo = 1\n  two\n\n  three\n\n# about bar\nbar = 1\n"
+        self.assertEqual(self.update(text, {'s': {'foo': 'x'}}),
+                         "[s]\nfoo = x\n\n# about bar\nbar = 1\n")
+
+    def test_section_header_rule(self):
+        text = "[a]]\nfoo = 1\n"
+        name = 'a]' if _GREEDY_HEADER else 'a'
+        self.assertEqual(self.update(text, {name: {'foo': '2'}}),
+                         "[a]]\nfoo = 2\n")
+
+    def test_remove_option(self):
+        text = "[s]\nfoo = a\n    b\nbar = 1\n"
+        self.assertEqual(self.update(text, {'s': {'foo': None, 'baz': None}}),
+                         "[s]\nbar = 1\n")
+
+    def test_option_names_are_normalized(self):
+        text = "[s]\nFoo = 1\n"
+        self.assertEqual(self.update(text, {'s': {'FOO': '2'}}),
+                         "[s]\nfoo = 2\n")
+
+    def test_new_option_added_at_end_of_section(self):
+        text = "[a]\nfoo = 1\n\n# about b\n[b]\nbar = 2"
+        self.assertEqual(self.update(text, {'a': {'baz': '3'}}),
+                         "[a]\nfoo = 1\nbaz = 3\n\n# about b\n[b]\nbar = 2\n")
+
+    def test_new_section_added_at_end(self):
+        text = "[a]\nfoo = 1"
+        self.assertEqual(self.update(text, {'b': {'bar': '2'}}),
+                         "[a]\nfoo = 1\n\n[b]\nbar = 2\n")
+
+    def test_empty_file(self):
+        self.assertEqual(self.update('', {'a': {'foo': '1'}}),
+                         "[a]\nfoo = 1\n")
+
+    def test_duplicate_option_replaced_once(self):
+        text = "[a]\nfoo = 1\nfoo = 2\n"
+        self.assertEqual(self.update(text, {'a': {'foo': '3'}}),
+                         "[a]\nfoo = 3\n")
+
+
+class SaveFilesTestCase(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.first = os.path.join(self.folder, 'first.cfg')
+        self.second = os.path.join(self.folder, 'second.cfg')
+        for filename in (self.first, self.second):
+            with io.open(filename, 'w') as fp:
+                fp.write('old')
+
+    def read(self, filename):
+        with io.open(filename) as fp:
+            return fp.read()
+
+    def test_save_files(self):
+        third = os.path.join(self.folder, 'third.cfg')
+        with patch('configglue._save.os.fsync') as mock_fsync:
+            save_files([(self.first, 'first'), (third, 'third')])
+        self.assertEqual(self.read(self.first), 'first')
+        self.assertEqual(self.read(self.first + '.old'), 'old')
+        self.assertEqual(self.read(third), 'third')
+        self.assertFalse(os.path.exists(third + '.old'))
+        self.assertFalse(os.path.exists(third + '.new'))
+        # both files and their directory are flushed to disk
+        self.assertEqual(mock_fsync.call_count, 3)
+
+    def test_write_failure_leaves_files_untouched(self):
+        missing = os.path.join(self.folder, 'missing', 'third.cfg')
+        self.assertRaises(IOError, save_files,
+                          [(self.first, 'first'), (missing, 'third')])
+        self.assertEqual(self.read(self.first), 'old')
+        self.assertEqual(sorted(os.listdir(self.folder)),
+                         ['first.cfg', 'second.cfg'])
+
+    def test_commit_failure_rolls_back(self):
+        replace = getattr(os, 'replace', os.rename)
+
+        def fail_second(src, dst):
+            if dst == self.second:
+                raise OSError("disk on fire")
+            replace(src, dst)
+
+        with patch('configglue._save._replace', side_effect=fail_second):
+            self.assertRaises(OSError, save_files,
+                              [(self.first, 'first'), (self.second, 'second')])
+        self.assertEqual(self.read(self.first), 'old')
+        self.assertEqual(self.read(self.second), 'old')
+        self.assertFalse(os.path.exists(self.first + '.new'))
+        self.assertFalse(os.path.exists(self.second + '.new'))
@@ -0,0 +1,64 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import unittest
+
+from configglue._scalars import (
+    make_bool_table,
+    parse_bool,
+    parse_bools,
+    parse_ints,
+)
+
+
+class TestScalars(unittest.TestCase):
+    def test_make_bool_table(self):
+        table = make_bool_table(('on',), ('no',))
+        self.assertEqual(table, {
+            'on': True, 'On': True, 'oN': True, 'ON': True,
+            'no': False, 'No': False, 'nO': False, 'NO': False})
+
+    def test_parse_bool(self):
+        for value in ('y', 'Y', '1', 'yes', 'On', 'tRuE'):
+            self.assertEqual(parse_bool(value), True)
+        for value in ('n', 'N', '0', 'No', 'OFF', 'False'):
+            self.assertEqual(parse_bool(value), False)
+        for value in ('', 'bla', ' true', '2'):
+            self.assertRaises(ValueError, parse_bool, value)
+
+    def test_parse_bool_custom_table(self):
+        table = make_bool_table(('true',), ('false',))
+        self.assertEqual(parse_bool('TRUE', table), True)
+        self.assertRaises(ValueError, parse_bool, 'y', table)
+
+    def test_parse_bools(self):
+        self.assertEqual(parse_bools(['Yes', 'off', '1']),
+                         [True, False, True])
+        self.assertEqual(parse_bools([]), [])
+
+    def test_parse_bools_invalid(self):
+        try:
+            parse_bools(['yes', 'bla'])
+        except ValueError as e:
+            self.assertTrue("'bla'" in str(e))
+        else:
+            self.fail('ValueError not raised')
+
+    def test_parse_ints(self):
+        self.assertEqual(parse_ints(['1', ' 2', '-3']), [1, 2, -3])
+        self.assertRaises(ValueError, parse_ints, ['1', 'x'])
+        self.assertEqual(parse_ints(['ff', '10'], 16), [255, 16])
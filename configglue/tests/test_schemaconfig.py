@@ -33,7 +33,10 @@ from mock import (
 from configglue._compat import PY2
 from configglue._compat import NoSectionError
 from configglue.glue import (
+    LazyValues,
+    _option_tables,
     configglue,
+    environ_overrides,
     schemaconfigglue,
 )
 from configglue.parser import SchemaConfigParser
@@ -297,6 +300,35 @@ class TestSchemaConfigGlue(unittest.TestCase):
             finally:
                 sys.argv = _argv
 
+    def test_glue_environ_overrides(self):
+        environ = {'CONFIGGLUE_FOO_BAR': '42', 'CONFIGGLUE_BAZ': '3',
+                   'FOO_BAR': '1', 'XCONFIGGLUE_BAZ': '2'}
+        self.assertEqual(environ_overrides(environ),
+                         {'FOO_BAR': '42', 'BAZ': '3'})
+
+    def test_glue_single_lookup_per_option(self):
+        """Test schemaconfigglue looks up each option value only once."""
+        config = BytesIO(b"[foo]\nbar=1")
+        self.parser.readfp(config)
+
+        with patch.object(os, 'environ', {'CONFIGGLUE_FOO_BAR': '42'}):
+            with patch.object(self.parser, 'get',
+                              wraps=self.parser.get) as mock_get:
+                op, options, args = schemaconfigglue(self.parser,
+                                                     argv=['--baz', '2'])
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(options, {'foo_bar': 1, 'baz': '2'})
+        self.assertEqual(self.parser.values(),
+            {'foo': {'bar': 42}, '__main__': {'baz': 2}})
+
+    def test_glue_fatal_option_from_cli(self):
+        class MySchema(Schema):
+            foo = IntOption(fatal=True)
+
+        parser = SchemaConfigParser(MySchema())
+        op, options, args = schemaconfigglue(parser, argv=['--foo', '2'])
+        self.assertEqual(parser.get('__main__', 'foo'), 2)
+
     def test_ambiguous_option(self):
         """Test schemaconfigglue when an ambiguous option is specified."""
         class MySchema(Schema):
@@ -357,6 +389,59 @@ class TestSchemaConfigGlue(unittest.TestCase):
         output = mock_stdout.getvalue()
         self.assertTrue(output.startswith('Usage:'))
 
+    def test_help_default(self):
+        """Test schemaconfigglue --help displays defaults from the parser."""
+        class MySchema(Schema):
+            foo = IntOption(help='The foo option [%default]')
+
+        config = BytesIO(b"[__main__]\nfoo=42")
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(config)
+
+        new_callable = StringIO
+        if PY2:
+            new_callable = BytesIO
+        with patch('sys.stdout', new_callable=new_callable) as mock_stdout:
+            self.assertRaises(SystemExit, schemaconfigglue, parser,
+                argv=['--help'])
+
+        output = mock_stdout.getvalue()
+        self.assertTrue('The foo option [42]' in output)
+
+    def test_help_lazy_defaults(self):
+        """Test schemaconfigglue --help does not resolve hidden defaults."""
+        new_callable = StringIO
+        if PY2:
+            new_callable = BytesIO
+        with patch.object(self.parser, 'get') as mock_get:
+            with patch('sys.stdout', new_callable=new_callable):
+                self.assertRaises(SystemExit, schemaconfigglue, self.parser,
+                    argv=['--help'])
+        self.assertFalse(mock_get.called)
+
+    def test_lazy_defaults(self):
+        """Test schemaconfigglue resolves defaults on access."""
+        config = BytesIO(b"[foo]\nbar=1")
+        self.parser.readfp(config)
+
+        op, options, args = schemaconfigglue(self.parser, argv=['--baz', '2'])
+        self.assertTrue(isinstance(options, LazyValues))
+        self.assertEqual(options.foo_bar, 1)
+        self.assertEqual(options.baz, '2')
+        self.assertEqual(options, {'foo_bar': 1, 'baz': '2'})
+
+    def test_option_table_cached(self):
+        """Test schemaconfigglue reuses option templates for a schema."""
+        _option_tables.clear()
+        op1, options, args = schemaconfigglue(self.parser, argv=[])
+        op2, options, args = schemaconfigglue(self.parser, argv=[])
+        self.assertEqual(len(_option_tables), 1)
+        # each parser gets its own copy of the cached options
+        option1 = op1.get_option('--baz')
+        option2 = op2.get_option('--baz')
+        self.assertFalse(option1 is option2)
+        self.assertEqual(option1.help, option2.help)
+
     def test_parser_set_with_encoding(self):
         """Test schemaconfigglue override an option with a non-ascii value."""
         class MySchema(Schema):
@@ -443,7 +528,8 @@ class ConfigglueTestCase(unittest.TestCase):
         # and fed with the configs file list
         self.assertEqual(glue.schema_parser, expected_schema_parser)
         mock_schema_parser.assert_called_with(MySchema())
-        mock_schema_parser.return_value.read.assert_called_with(configs)
+        mock_schema_parser.return_value.read.assert_called_with(configs,
+            workers=None)
         # the other attributes are the result of calling schemaconfigglue
         mock_schemaconfigglue.assert_called_with(expected_schema_parser,
             op=None)
@@ -479,7 +565,8 @@ class ConfigglueTestCase(unittest.TestCase):
         # and fed with the configs file list
         self.assertEqual(glue.schema_parser, expected_schema_parser)
         mock_schema_parser.assert_called_with(MySchema())
-        mock_schema_parser.return_value.read.assert_called_with(configs)
+        mock_schema_parser.return_value.read.assert_called_with(configs,
+            workers=None)
         # the other attributes are the result of calling schemaconfigglue
         mock_schemaconfigglue.assert_called_with(expected_schema_parser,
             op=None)
@@ -516,7 +603,8 @@ class ConfigglueTestCase(unittest.TestCase):
         # and fed with the configs file list
         self.assertEqual(glue.schema_parser, expected_schema_parser)
         mock_schema_parser.assert_called_with(MySchema())
-        mock_schema_parser.return_value.read.assert_called_with(configs)
+        mock_schema_parser.return_value.read.assert_called_with(configs,
+            workers=None)
         # the other attributes are the result of calling schemaconfigglue
         mock_schemaconfigglue.assert_called_with(expected_schema_parser,
             op=op)
@@ -0,0 +1,96 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import TestCase
+
+from configglue.parser import SchemaConfigParser
+from configglue.schema import (
+    BoolOption,
+    DictOption,
+    IntOption,
+    ListOption,
+    Schema,
+    Section,
+    StringOption,
+    TupleOption,
+)
+from configglue.snapshot import Snapshot, dump_snapshot, write_snapshot
+
+
+class MySchema(Schema):
+    foo = IntOption()
+    bar = StringOption()
+
+    class other(Section):
+        flag = BoolOption()
+        items = ListOption(item=IntOption())
+        pair = TupleOption(2)
+        mapping = DictOption()
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.path = os.path.join(folder, 'config.snapshot')
+
+    def make_parser(self, config):
+        parser = SchemaConfigParser(MySchema())
+        parser.readfp(BytesIO(config))
+        return parser
+
+    def test_values(self):
+        parser = self.make_parser(
+            b"[__main__]\nfoo = 42\nbar = caf\xc3\xa9\n"
+            b"[other]\nflag = yes\nitems = 1\n  2\npair = a,b\n"
+            b"mapping = {\"a\": \"1\"}\n")
+        write_snapshot(parser, self.path)
+
+        snapshot = Snapshot(self.path)
+        self.addCleanup(snapshot.close)
+        self.assertEqual(snapshot.values(), parser.values())
+        self.assertEqual(snapshot.get('__main__', 'bar'), 'caf\xe9')
+        self.assertEqual(snapshot.get('other', 'pair'), ('a', 'b'))
+        self.assertEqual(sorted(snapshot.sections()), ['__main__', 'other'])
+        self.assertRaises(KeyError, snapshot.get, '__main__', 'missing')
+
+    def test_refresh(self):
+        write_snapshot(self.make_parser(b"[__main__]\nfoo = 1"), self.path)
+        snapshot = Snapshot(self.path)
+        self.addCleanup(snapshot.close)
+        self.assertFalse(snapshot.refresh())
+
+        write_snapshot(self.make_parser(b"[__main__]\nfoo = 2"), self.path)
+        # the mapped snapshot is unaffected until refreshed
+        self.assertEqual(snapshot.get('__main__', 'foo'), 1)
+        self.assertTrue(snapshot.refresh())
+        self.assertEqual(snapshot.get('__main__', 'foo'), 2)
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as fp:
+            fp.write(b"[__main__]\nfoo = 1\n")
+        self.assertRaises(ValueError, Snapshot, self.path)
+
+    def test_from_bytes(self):
+        parser = self.make_parser(b"[__main__]\nfoo = 1\n[other]\npair = a,b")
+        snapshot = Snapshot.from_bytes(dump_snapshot(parser))
+        self.assertEqual(snapshot.values(), parser.values())
+        self.assertFalse(snapshot.refresh())
@@ -0,0 +1,151 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from configglue import validate
+from configglue.__main__ import main as configglue_main
+from configglue.parser import SchemaConfigParser, _read_file
+from configglue.schema import IntOption, Schema, Section, StringOption
+
+
+SCHEMA = 'configglue.tests.test_validate:MySchema'
+
+
+class MySchema(Schema):
+    foo = IntOption(fatal=True)
+
+    class other(Section):
+        bar = StringOption()
+
+
+class ValidateTestCase(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        # start each test with a fresh process state
+        patcher = patch.multiple(validate, _reference=None, _schema=None,
+                                 _schema_state={}, _contents={},
+                                 _parsed={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.write('common.cfg', "[other]\nbar = shared\n")
+        self.write('hosts/a/main.cfg',
+                   "[__main__]\nfoo = 1\nincludes = ../../common.cfg\n")
+        self.write('hosts/b/main.cfg',
+                   "[__main__]\nfoo = 2\nincludes = ../../common.cfg\n")
+        self.write('hosts/c/main.cfg', "[__main__]\nfoo = x\n")
+        self.write('hosts/c/notes.txt', "not a config\n")
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def write(self, name, content):
+        path = self.path(name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as fp:
+            fp.write(content)
+
+    def test_find_configs(self):
+        self.assertEqual(
+            validate.find_configs([self.path('hosts'), 'other.cfg']),
+            [self.path('hosts/a/main.cfg'), self.path('hosts/b/main.cfg'),
+             self.path('hosts/c/main.cfg'), 'other.cfg'])
+        self.assertEqual(
+            validate.find_configs([self.path('hosts')], pattern='*.txt'),
+            [self.path('hosts/c/notes.txt')])
+
+    def test_validate_files(self):
+        paths = validate.find_configs([self.path('hosts')])
+        paths.append(self.path('missing.cfg'))
+        results = validate.validate_files(SCHEMA, paths, processes=1)
+
+        self.assertEqual([result['path'] for result in results], paths)
+        self.assertEqual([result['valid'] for result in results],
+                         [True, True, False, False])
+        self.assertEqual(results[0]['errors'], [])
+        self.assertEqual(results[3]['errors'], ["File could not be read"])
+        for result in results:
+            self.assertTrue(result['seconds'] >= 0)
+
+    def test_validate_files_parallel(self):
+        paths = validate.find_configs([self.path('hosts')])
+        results = validate.validate_files(SCHEMA, paths, processes=2)
+        self.assertEqual([result['valid'] for result in results],
+                         [True, True, False])
+
+    def test_shared_includes_read_once(self):
+        paths = validate.find_configs([self.path('hosts')])
+        with patch('configglue.parser._read_file') as mock_read_file:
+            mock_read_file.side_effect = _read_file
+            validate.validate_files(SCHEMA, paths, processes=1)
+
+        read = [os.path.normpath(call[0][0])
+                for call in mock_read_file.call_args_list]
+        self.assertEqual(read.count(self.path('common.cfg')), 1)
+
+    def test_shared_includes_parsed_once(self):
+        paths = validate.find_configs([self.path('hosts')])
+        update = SchemaConfigParser._update
+        parsed = []
+
+        def record(parser, text, fpname):
+            parsed.append(os.path.normpath(fpname))
+            return update(parser, text, fpname)
+        with patch.object(SchemaConfigParser, '_update', record):
+            results = validate.validate_files(SCHEMA, paths, processes=1)
+
+        self.assertEqual(parsed.count(self.path('common.cfg')), 1)
+        self.assertEqual([result['valid'] for result in results],
+                         [True, True, False])
+        # the sections read from the cache are those of the file
+        parser = validate._CachingParser(validate._schema)
+        parser._included = False
+        parser.read(paths[1])
+        self.assertEqual(parser.values(),
+                         {'__main__': {'foo': 2}, 'other': {'bar': 'shared'}})
+        self.assertEqual(parser._positions[('other', 'bar')],
+                         (self.path('hosts/b/../../common.cfg'), 2))
+
+    def test_main(self):
+        output = self.path('report.json')
+        status = configglue_main(['validate', SCHEMA, self.path('hosts/a'),
+                                  '-j', '1', '-o', output])
+        self.assertEqual(status, 0)
+        with open(output) as fp:
+            report = json.load(fp)
+        self.assertEqual(report['schema'], SCHEMA)
+        self.assertTrue(report['valid'])
+        self.assertEqual([result['path'] for result in report['files']],
+                         [self.path('hosts/a/main.cfg')])
+
+    def test_main_invalid(self):
+        output = self.path('report.json')
+        status = configglue_main(['validate', SCHEMA, self.path('hosts'),
+                                  '-j', '1', '-o', output])
+        self.assertEqual(status, 1)
+
+    def test_main_unknown_command(self):
+        with patch('sys.stderr'):
+            self.assertEqual(configglue_main(['unknown']), 2)
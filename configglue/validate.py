@@ -0,0 +1,240 @@
+###############################################################################
+#
+# configglue -- glue for your apps' configuration
+#
+# A library for simple, DRY configuration of applications
+#
+# (C) 2009--2013 by Canonical Ltd.
+# by John R. Lenton <john.lenton@canonical.com>
+# and Ricardo Kirkner <ricardo.kirkner@canonical.com>
+#
+# Released under the BSD License (see the file LICENSE)
+#
+# For bug reports, support, and new releases: http://launchpad.net/configglue
+#
+###############################################################################
+
+"""Validate many config files against a schema, in parallel.
+
+Run with:
+
+    python -m configglue validate module:SchemaClass ROOT...
+
+Each root is a config file, or a directory searched for config files. The
+files are validated by a pool of processes, each one loading the schema
+once and keeping what it reads from included files, so files shared by
+many configs through includes are read and parsed once per process. A
+JSON report, with the errors and validation time of every file, is
+written to stdout.
+
+"""
+from __future__ import print_function
+
+import argparse
+import fnmatch
+import json
+import os
+import time
+
+from .parser import SchemaConfigParser
+from .schema import load_schema
+
+
+__all__ = [
+    'find_configs',
+    'validate_file',
+    'validate_files',
+]
+
+# state of the current validating process
+_reference = None
+_schema = None
+_schema_state = {}
+_contents = {}
+_parsed = {}
+
+
+class _CachingParser(SchemaConfigParser):
+    """A SchemaConfigParser keeping what it reads from included files.
+
+    The sections read from an included file are kept, along with the
+    positions and locations of their options, and reused whenever another
+    config includes the file. Files including others themselves are only
+    kept as text, as what they read depends on the files read before them.
+
+    The sets of schema option names are shared by all the parsers.
+
+    """
+
+    # whether the files read are included by other configs
+    _included = True
+
+    def __init__(self, schema):
+        super(_CachingParser, self).__init__(schema)
+        self.__dict__.update(_schema_state)
+
+    def _read_path(self, path):
+        if not self._included:
+            return super(_CachingParser, self)._read_path(path)
+        key = os.path.normpath(path)
+        content = _contents.get(key)
+        if content is None:
+            content = super(_CachingParser, self)._read_path(path)
+            if content is not None:
+                _contents[key] = content
+        return content
+
+    def _read_sections(self, content, fpname, already_read):
+        if not self._included:
+            return super(_CachingParser, self)._read_sections(
+                content, fpname, already_read)
+        key = os.path.normpath(fpname)
+        cached = _parsed.get(key)
+        if cached is None:
+            # read the file on its own, to tell its positions and locations
+            parser = _CachingParser(self.schema)
+            parser._basedir = self._basedir
+            parser._sources = self._sources
+            sections = SchemaConfigParser._read_sections(
+                parser, content, fpname, already_read)
+            if 'includes' in sections.get('__main__', ()):
+                self._positions.update(parser._positions)
+                self._location.update(parser._location)
+                already_read.add(fpname)
+                return sections
+            # everything in a file without includes was read from it
+            cached = _parsed[key] = (
+                sections,
+                [(name, lineno) for name, (_, lineno)
+                 in parser._positions.items()],
+                list(parser._location))
+
+        sections, positions, location = cached
+        for name, lineno in positions:
+            self._positions[name] = (fpname, lineno)
+        for option in location:
+            self._location[option] = fpname
+        already_read.add(fpname)
+        return dict((name, self._dict(options))
+                    for name, options in sections.items())
+
+
+def _init(reference):
+    global _reference, _schema
+    if reference != _reference:
+        _schema = load_schema(reference)()
+        _reference = reference
+        _contents.clear()
+        _parsed.clear()
+        parser = SchemaConfigParser(_schema)
+        _schema_state.clear()
+        _schema_state.update(_option_names=parser._get_option_names(),
+                             _schema_index=parser._get_schema_index())
+
+
+def validate_file(path):
+    """Validate a config file against the schema of the current process.
+
+    Return a dict with the path of the file, whether it's valid, its errors
+    and the seconds it took to validate.
+
+    """
+    start = time.time()
+    parser = _CachingParser(_schema)
+    parser._included = False
+    try:
+        if parser.read(path):
+            valid, errors = parser.is_valid(report=True)
+        else:
+            valid, errors = False, ["File could not be read"]
+    except Exception as e:
+        valid, errors = False, ['{0}: {1}'.format(type(e).__name__, e)]
+    return {
+        'path': path,
+        'valid': valid,
+        'errors': errors,
+        'seconds': time.time() - start,
+    }
+
+
+def find_configs(roots, pattern='*.cfg'):
+    """Return the config files in roots.
+
+    Roots are config files, or directories searched recursively for files
+    whose name matches pattern.
+
+    """
+    paths = []
+    for root in roots:
+        if not os.path.isdir(root):
+            paths.append(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            names = sorted(fnmatch.filter(filenames, pattern))
+            paths.extend(os.path.join(dirpath, name) for name in names)
+    return paths
+
+
+def validate_files(reference, paths, processes=None):
+    """Validate config files against the schema class reference refers to.
+
+    *reference* is a 'module:ClassName' string. The files are validated by
+    a pool of *processes* processes, one per CPU by default; with a single
+    process they're validated in the current one.
+
+    Return the list of the results of validate_file, in the order of paths.
+
+    """
+    # load the schema before starting the pool, so forked processes
+    # inherit it instead of loading it again
+    _init(reference)
+    if processes == 1:
+        return [validate_file(path) for path in paths]
+
+    # import here as processes are only needed for parallel validation
+    from multiprocessing import Pool, cpu_count
+
+    processes = processes or cpu_count()
+    pool = Pool(processes, initializer=_init, initargs=(reference,))
+    try:
+        # send files in chunks, so includes are shared by nearby files
+        chunksize = max(1, len(paths) // (processes * 4))
+        return pool.map(validate_file, paths, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog='python -m configglue validate',
+        description="Validate config files against a schema.")
+    ap.add_argument('schema', help="the schema class, as module:ClassName")
+    ap.add_argument('roots', nargs='+', metavar='root',
+                    help="a config file, or a directory of config files")
+    ap.add_argument('-p', '--pattern', default='*.cfg',
+                    help="name of the config files in directories "
+                         "(default: %(default)s)")
+    ap.add_argument('-j', '--processes', type=int,
+                    help="number of processes (default: one per CPU)")
+    ap.add_argument('-o', '--output', help="write the report to a file")
+    args = ap.parse_args(argv)
+
+    start = time.time()
+    paths = find_configs(args.roots, args.pattern)
+    results = validate_files(args.schema, paths, args.processes)
+    report = {
+        'schema': args.schema,
+        'valid': all(result['valid'] for result in results),
+        'seconds': time.time() - start,
+        'files': results,
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(output)
+    else:
+        print(output)
+    return 0 if report['valid'] else 1